@@ -0,0 +1,170 @@
+# bench_startup.py
+
+"""Measure how long the app takes to show its first frame, and why.
+
+    python bench_startup.py [--runs 5] [--heatmap matplotlib|canvas] [--output startup.json]
+
+Each run starts ``main.py``'s app in a fresh interpreter and reports the time
+from spawning the process until the timer frame is visible. The cold run
+compiles every module from scratch (an empty bytecode cache); warm runs reuse
+it. A separate run under ``-X importtime`` attributes import cost to top-level
+packages. After the first frame each run also builds the heatmap view, timing
+its import and ``__init__`` apart from ``TimerView.__init__``.
+
+Results are printed as JSON. Needs a display (e.g. run under ``xvfb-run``).
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+# Packages whose import cost is always reported, even when not imported
+WATCHED_PACKAGES = ("tkinter", "PIL", "plyer", "numpy", "pandas", "matplotlib", "seaborn")
+
+
+def run_child():
+    """Start the app, report timings as one JSON line on stdout, and exit."""
+    spawned = float(os.environ["BENCH_SPAWNED"])
+    import importlib
+    import tkinter as tk
+
+    import main
+    import timer_view
+
+    timings = {}
+
+    def timed(name, func):
+        def wrapper(*args, **kwargs):
+            started = time.monotonic()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings[name] = time.monotonic() - started
+        return wrapper
+
+    timer_view.TimerView.__init__ = timed("timer_view_init_s", timer_view.TimerView.__init__)
+    # Keep the background prewarm from skewing the heatmap timings below
+    main.ProductivityApp.prewarm_heatmap = lambda self: None
+
+    root = tk.Tk()
+    app = main.ProductivityApp(root)
+    root.wait_visibility(app.timer_view.frame)
+    root.update_idletasks()
+    timings["first_frame_s"] = time.monotonic() - spawned
+
+    module_name, class_name = app.heatmap_renderer
+    started = time.monotonic()
+    view_class = getattr(importlib.import_module(module_name), class_name)
+    timings["heatmap_import_s"] = time.monotonic() - started
+    view_class.__init__ = timed("heatmap_view_init_s", view_class.__init__)
+    app.get_heatmap_view()
+
+    app.on_close()
+    print(json.dumps(timings), flush=True)
+
+
+def spawn(workdir, env, extra_args=()):
+    """Run one child; return its timings and its stderr."""
+    env = dict(env, BENCH_SPAWNED=repr(time.monotonic()))
+    result = subprocess.run(
+        [sys.executable, *extra_args, os.path.join(REPO_DIR, "bench_startup.py"), "--child"],
+        cwd=workdir, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Startup run failed:\n{result.stderr}")
+    return json.loads(result.stdout.splitlines()[-1]), result.stderr
+
+
+def parse_importtime(stderr):
+    """Aggregate ``-X importtime`` output into per-package self time and cumulative time.
+
+    Returns ({top-level package: self ms}, {top-level package: cumulative ms}).
+    """
+    self_ms = {}
+    cumulative_ms = {}
+    # Each import is listed after the imports it triggered, indented one level
+    # deeper; read backwards to see importers first
+    importers = []
+    for line in reversed(stderr.splitlines()):
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        package = name.strip().split(".")[0]
+        del importers[depth:]
+        self_ms[package] = self_ms.get(package, 0) + int(self_us) / 1000
+        # Count a package's cumulative time where it is entered from outside it
+        if not importers or importers[-1] != package:
+            cumulative_ms[package] = cumulative_ms.get(package, 0) + int(cumulative_us) / 1000
+        importers.append(package)
+    return self_ms, cumulative_ms
+
+
+def summarize(runs):
+    keys = runs[0].keys()
+    return {
+        key: {
+            "min": min(run[key] for run in runs),
+            "median": statistics.median(run[key] for run in runs),
+            "max": max(run[key] for run in runs),
+        }
+        for key in keys
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark app startup.")
+    parser.add_argument("--runs", type=int, default=5, help="number of warm runs (default: 5)")
+    parser.add_argument("--heatmap", choices=("matplotlib", "canvas"),
+                        default=os.environ.get("PRODUCTIVITY_HEATMAP", "matplotlib"))
+    parser.add_argument("--top", type=int, default=15, help="number of packages to list by import time")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        run_child()
+        return 0
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # Run against empty data and no daemon, with the repo's images
+        os.symlink(os.path.join(REPO_DIR, "images"), os.path.join(workdir, "images"))
+        env = dict(os.environ,
+                   PYTHONPATH=os.pathsep.join(filter(None, [REPO_DIR, os.environ.get("PYTHONPATH")])),
+                   PYTHONPYCACHEPREFIX=os.path.join(workdir, "pycache"),
+                   PRODUCTIVITY_HEATMAP=args.heatmap,
+                   PRODUCTIVITY_SOCKET=os.path.join(workdir, "no-daemon.sock"))
+        env.pop("PRODUCTIVITY_STORAGE", None)
+
+        cold, _ = spawn(workdir, env)
+        warm = [spawn(workdir, env)[0] for _ in range(args.runs)]
+        _, stderr = spawn(workdir, env, ("-X", "importtime"))
+
+    self_ms, cumulative_ms = parse_importtime(stderr)
+    top = sorted(self_ms.items(), key=lambda item: -item[1])[:args.top]
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "heatmap": args.heatmap,
+        "cold": cold,
+        "warm": summarize(warm),
+        "imports": {
+            "self_ms_by_package": dict(top),
+            "cumulative_ms": {package: cumulative_ms.get(package, 0.0) for package in WATCHED_PACKAGES},
+        },
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+# bench_storage.py
+
+"""Measure storage and heatmap costs over synthetic multi-year histories.
+
+    python bench_storage.py [--years 1 5 20] [--sessions-per-day 4] [--labels 8]
+                            [--modes json journal sqlite partitioned columnar]
+                            [--output storage.json]
+
+For each history length a synthetic ``productivity_data.json`` is generated
+and every storage mode is opened on it (migrating as ``open_store`` does).
+Per mode it times ``load``, ``load_range`` over the past year (what the
+heatmap reads) and ``save_session``; per history it times the heatmap's
+``prepare_data_for_heatmap`` and drawing the figure with the Agg backend.
+Each operation reports p50/p95/p99 latency in milliseconds and the peak
+memory traced during one extra call. Runs headless and prints JSON.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import matplotlib
+
+matplotlib.use("Agg")  # Render without a display; must precede importing pyplot
+
+from storage import DATE_FORMAT, add_session, atomic_write_json, filter_range, open_store
+
+MODES = ("json", "journal", "sqlite", "partitioned", "columnar")
+
+
+def generate_history(years, sessions_per_day, labels, end_date, seed=0):
+    """Return a per-day view with ``sessions_per_day`` sessions on each of ``years`` years of days."""
+    rng = random.Random(seed)
+    data = {}
+    for offset in range(years * 365):
+        date_str = (end_date - timedelta(days=offset)).strftime(DATE_FORMAT)
+        for _ in range(sessions_per_day):
+            add_session(data, date_str, rng.choice(labels), rng.randint(5, 90))
+    return data
+
+
+def percentile(sorted_values, fraction):
+    """Return the nearest-rank percentile of already sorted values."""
+    rank = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def measure(func, repeat):
+    """Time ``repeat`` calls of func, then trace the peak memory of one more."""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started)
+    durations.sort()
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "samples": repeat,
+        "p50_ms": percentile(durations, 0.50) * 1000,
+        "p95_ms": percentile(durations, 0.95) * 1000,
+        "p99_ms": percentile(durations, 0.99) * 1000,
+        "peak_kib": peak / 1024,
+    }
+
+
+def bench_store(mode, path, end_date, labels, repeat, save_samples):
+    store = open_store(mode, path)
+    year_start = end_date - timedelta(days=365)
+    results = {
+        "load": measure(store.load, repeat),
+        "load_year": measure(lambda: store.load_range(year_start, end_date), repeat),
+    }
+    rng = random.Random(1)
+    today = end_date.strftime(DATE_FORMAT)
+    results["save_session"] = measure(
+        lambda: store.save_session(today, rng.choice(labels), rng.randint(5, 90)), save_samples)
+    return results
+
+
+def bench_heatmap(data, end_date, repeat):
+    """Time aggregating one year of the history and drawing it, without Tk."""
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    from heatmap_view import HeatmapView
+
+    # Only the data methods of the view are used, so skip its Tk __init__
+    view = HeatmapView.__new__(HeatmapView)
+    view.end_date = end_date
+    view.start_date = end_date - timedelta(days=365)
+    year = filter_range(data, view.start_date, end_date)
+    pivot_table = view.prepare_data_for_heatmap(year)
+
+    def render():
+        view.build_figure(pivot_table)
+        FigureCanvasAgg(view.figure).draw()
+        plt.close(view.figure)
+
+    return {
+        "aggregate": measure(lambda: view.prepare_data_for_heatmap(year), repeat),
+        "render": measure(render, repeat),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark storage modes over synthetic histories.")
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--sessions-per-day", type=int, default=4)
+    parser.add_argument("--labels", type=int, default=8, help="number of distinct activity labels")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--repeat", type=int, default=20, help="timed calls per read operation")
+    parser.add_argument("--save-samples", type=int, default=100, help="timed save_session calls")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    end_date = date.today()
+    labels = [f"Activity {number}" for number in range(args.labels)]
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sessions_per_day": args.sessions_per_day,
+        "labels": args.labels,
+        "histories": {},
+    }
+    for years in args.years:
+        data = generate_history(years, args.sessions_per_day, labels, end_date, args.seed)
+        history = {"days": len(data), "stores": {}}
+        for mode in args.modes:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "productivity_data.json")
+                atomic_write_json(path, data)
+                history["json_bytes"] = os.path.getsize(path)
+                history["stores"][mode] = bench_store(mode, path, end_date, labels,
+                                                      args.repeat, args.save_samples)
+            print(f"{years}y {mode} done", file=sys.stderr)
+        history["heatmap"] = bench_heatmap(data, end_date, args.repeat)
+        report["histories"][f"{years}y"] = history
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
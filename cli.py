@@ -0,0 +1,127 @@
+# cli.py
+
+"""Control the timer and report on sessions without loading the GUI.
+
+    python -m cli start [--label Study] [--focus 25] [--break 5]
+    python -m cli pause | reset | toggle | status
+    python -m cli report [--range 7d | --range 2026-01-01:2026-01-31]
+    python -m cli daemon
+
+Timer commands talk to the timer daemon; ``report`` reads the store directly.
+"""
+
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+
+from storage import open_store
+from timer_daemon import TimerClient
+
+TIMER_COMMANDS = ("start", "pause", "reset", "toggle", "status")
+
+
+def parse_range(text, today=None):
+    """Parse ``Nd`` (the last N days) or ``YYYY-MM-DD:YYYY-MM-DD`` into a date range."""
+    today = today or date.today()
+    if text.endswith("d") and text[:-1].isdigit():
+        days = int(text[:-1])
+        if days < 1:
+            raise argparse.ArgumentTypeError(f"Invalid range: {text} (need at least 1 day)")
+        return today - timedelta(days=days - 1), today
+    start, separator, end = text.partition(":")
+    if not separator:
+        raise argparse.ArgumentTypeError(f"Invalid range: {text}")
+    try:
+        start_date, end_date = date.fromisoformat(start), date.fromisoformat(end)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid range: {text}")
+    if start_date > end_date:
+        raise argparse.ArgumentTypeError(f"Invalid range: {text} (start is after end)")
+    return start_date, end_date
+
+
+def format_minutes(minutes):
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02}m" if hours else f"{minutes}m"
+
+
+def format_status(status):
+    seconds_left = status["seconds_left"]
+    minutes, seconds = divmod(abs(int(seconds_left)), 60)
+    sign = "-" if seconds_left < 0 else ""
+    return f"{status['state']} {status['mode']} {sign}{minutes:02}:{seconds:02} ({status['activity_label']})"
+
+
+def run_timer_command(args):
+    client = TimerClient(os.environ.get("PRODUCTIVITY_SOCKET"))
+    settings = {}
+    if args.command == "start":
+        if args.label is not None:
+            settings["activity_label"] = args.label
+        if args.focus is not None:
+            settings["focus_minutes"] = args.focus
+        if args.break_minutes is not None:
+            settings["break_minutes"] = args.break_minutes
+    try:
+        status = client.request(args.command, **settings)
+    except OSError:
+        print(f"No timer daemon on {client.socket_path}; start one with: python -m cli daemon",
+              file=sys.stderr)
+        return 1
+    print(format_status(status))
+    return 0
+
+
+def run_report(args):
+    start_date, end_date = args.range
+    store = open_store(os.environ.get("PRODUCTIVITY_STORAGE", "json"))
+    data = store.load_range(start_date, end_date)
+
+    label_totals = {}
+    for day in data.values():
+        for label, minutes in day.items():
+            label_totals[label] = label_totals.get(label, 0) + minutes
+
+    print(f"{start_date.isoformat()} .. {end_date.isoformat()}")
+    for label, minutes in sorted(label_totals.items(), key=lambda item: -item[1]):
+        print(f"  {label:<20} {format_minutes(minutes):>8}")
+    print(f"  {'Total':<20} {format_minutes(sum(label_totals.values())):>8}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Productivity timer command line.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    start = commands.add_parser("start", help="start a countdown")
+    start.add_argument("--label", help="activity label for the session")
+    start.add_argument("--focus", type=int, help="focus time in minutes")
+    start.add_argument("--break", dest="break_minutes", type=int, help="break time in minutes")
+    commands.add_parser("pause", help="pause or resume the countdown")
+    commands.add_parser("reset", help="save the session and reset the countdown")
+    commands.add_parser("toggle", help="switch between focus and break")
+    commands.add_parser("status", help="show the timer state")
+
+    report = commands.add_parser("report", help="summarize focus time per activity")
+    report.add_argument("--range", type=parse_range, default="7d",
+                        help="'Nd' for the last N days or 'YYYY-MM-DD:YYYY-MM-DD' (default: 7d)")
+
+    commands.add_parser("daemon", help="run the timer daemon in the foreground")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command in TIMER_COMMANDS:
+        return run_timer_command(args)
+    if args.command == "report":
+        return run_report(args)
+    if args.command == "daemon":
+        import timer_daemon
+        timer_daemon.main([])
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
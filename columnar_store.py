@@ -0,0 +1,291 @@
+# columnar_store.py
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+from datetime import date
+
+from storage import (DATE_FORMAT, JsonStore, add_session, atomic_write_bytes, atomic_write_json, file_lock,
+                     iter_sessions, parse_date_str)
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; records are then decoded with struct
+    np = None
+
+MAGIC = b"PTCOL1\0\0"
+HEADER_SIZE = len(MAGIC)
+# Day ordinal (date.toordinal), label id, focus minutes
+RECORD = struct.Struct("<IHH")
+MAX_MINUTES = 0xFFFF
+
+# The day index: (day ordinal, first record of that day) for each day, in order
+INDEX_MAGIC = b"PTIDX1\0\0"
+# Written instead when records are no longer in day order, so ranges fall back to a scan
+INDEX_DISABLED = b"PTIDX1\0X"
+INDEX_ENTRY = struct.Struct("<II")
+
+if np is not None:
+    RECORD_DTYPE = np.dtype([("day", "<u4"), ("label", "<u2"), ("minutes", "<u2")])
+
+
+class ColumnarStore:
+    """Store sessions as fixed-width binary records plus an interned label table.
+
+    ``<base>.bin`` holds an 8-byte header followed by one 8-byte record per
+    saved session (day ordinal as uint32, label id as uint16, minutes as
+    uint16), and ``<base>.labels.json`` lists the labels by id. Saves append
+    records; reads memory-map the file and, when NumPy is installed, view it
+    as a structured array without copying.
+
+    While records are appended in day order, ``<base>.idx`` maps each day to
+    its first record, so ``load_range`` binary-searches the index and only
+    touches the pages of the records in range.
+    """
+
+    # Range reads are already cheap, so views can skip the rollup cache
+    indexed_reads = True
+
+    def __init__(self, base_path):
+        self.path = base_path + ".bin"
+        self.labels_path = base_path + ".labels.json"
+        self.index_path = base_path + ".idx"
+        self.labels = self._read_labels()
+
+    def _read_labels(self):
+        try:
+            with open(self.labels_path, 'r') as file:
+                return [sys.intern(label) for label in json.load(file)]
+        except FileNotFoundError:
+            return []
+
+    def _label_ids(self, activity_labels):
+        """Return the id of each label, adding unknown ones to the table."""
+        self.labels = self._read_labels()
+        ids = {label: label_id for label_id, label in enumerate(self.labels)}
+        new_labels = [label for label in dict.fromkeys(activity_labels) if label not in ids]
+        if new_labels:
+            for label in new_labels:
+                ids[label] = len(self.labels)
+                self.labels.append(label)
+            if len(self.labels) > 0xFFFF:
+                raise ValueError("Too many distinct activity labels for a uint16 id")
+            atomic_write_json(self.labels_path, self.labels)
+        return ids
+
+    def record_count(self):
+        """Return the number of complete records in the file."""
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+        return max(0, size - HEADER_SIZE) // RECORD.size
+
+    def _map(self):
+        count = self.record_count()
+        if count == 0:
+            return None, 0
+        with open(self.path, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[:HEADER_SIZE] != MAGIC:
+            mapped.close()
+            raise ValueError(f"{self.path} is not a session records file")
+        return mapped, count
+
+    def columns(self, start=0, stop=None):
+        """Return the records from index ``start`` up to ``stop``.
+
+        With NumPy this is a structured array with ``day``, ``label`` and
+        ``minutes`` fields backed directly by the memory map; without it, a
+        list of (day, label, minutes) tuples.
+        """
+        mapped, count = self._map()
+        if stop is not None:
+            count = min(count, stop)
+        if mapped is None or start >= count:
+            if np is not None:
+                return np.empty(0, dtype=RECORD_DTYPE)
+            return []
+        offset = HEADER_SIZE + start * RECORD.size
+        if np is not None:
+            return np.frombuffer(mapped, dtype=RECORD_DTYPE, count=count - start, offset=offset)
+        try:
+            return list(RECORD.iter_unpack(mapped[offset:HEADER_SIZE + count * RECORD.size]))
+        finally:
+            mapped.close()
+
+    def _to_sessions(self, records):
+        if np is not None and isinstance(records, np.ndarray):
+            records = records.tolist()
+        labels = self.labels
+        if records and max(record[1] for record in records) >= len(labels):
+            labels = self.labels = self._read_labels()
+        return [
+            (date.fromordinal(day).strftime(DATE_FORMAT), labels[label_id], minutes)
+            for day, label_id, minutes in records
+        ]
+
+    def _to_view(self, records):
+        data = {}
+        for date_str, activity_label, focus_duration in self._to_sessions(records):
+            add_session(data, date_str, activity_label, focus_duration)
+        return data
+
+    def load(self):
+        """Return the per-day view of all recorded sessions."""
+        return self._to_view(self.columns())
+
+    def _read_index(self):
+        """Return the memory-mapped day index, or None if there is no usable one."""
+        try:
+            with open(self.index_path, 'rb') as file:
+                if file.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                    return None
+                return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None  # ValueError: nothing after the header to map
+
+    def _record_span(self, first, last):
+        """Return the (start, stop) record indices for days first..last, or None without an index."""
+        index = self._read_index()
+        if index is None:
+            return None
+        entries = (len(index) - len(INDEX_MAGIC)) // INDEX_ENTRY.size
+        if np is not None:
+            days = np.frombuffer(index, dtype="<u4", count=entries * 2, offset=len(INDEX_MAGIC))
+            days, starts = days[0::2], days[1::2]
+            lo, hi = np.searchsorted(days, [first, last + 1])
+            start = int(starts[lo]) if lo < entries else None
+            stop = int(starts[hi]) if hi < entries else None
+        else:
+            def entry(i):
+                return INDEX_ENTRY.unpack_from(index, len(INDEX_MAGIC) + i * INDEX_ENTRY.size)
+            lo = bisect.bisect_left(range(entries), first, key=lambda i: entry(i)[0])
+            hi = bisect.bisect_left(range(entries), last + 1, key=lambda i: entry(i)[0])
+            start = entry(lo)[1] if lo < entries else None
+            stop = entry(hi)[1] if hi < entries else None
+            index.close()
+        if start is None:
+            start = self.record_count()
+        return start, stop
+
+    def load_range(self, start_date, end_date):
+        """Return the per-day view for the days between start_date and end_date."""
+        first, last = start_date.toordinal(), end_date.toordinal()
+        span = self._record_span(first, last)
+        if span is not None:
+            return self._to_view(self.columns(*span))
+
+        records = self.columns()
+        if np is not None:
+            records = records[(records["day"] >= first) & (records["day"] <= last)]
+        else:
+            records = [record for record in records if first <= record[0] <= last]
+        return self._to_view(records)
+
+    def save_session(self, date_str, activity_label, focus_duration):
+        """Append one session record."""
+        self.save_sessions([(date_str, activity_label, focus_duration)])
+
+    def save_sessions(self, sessions):
+        """Append several (date_str, activity_label, focus_duration) sessions as records."""
+        with file_lock(self.path):
+            ids = self._label_ids([session[1] for session in sessions])
+            chunks = []
+            for date_str, activity_label, focus_duration in sessions:
+                day = parse_date_str(date_str).toordinal()
+                # Durations beyond a uint16 are split over several records
+                while focus_duration > 0:
+                    minutes = min(focus_duration, MAX_MINUTES)
+                    chunks.append(RECORD.pack(day, ids[activity_label], minutes))
+                    focus_duration -= minutes
+
+            with open(self.path, 'ab') as file:
+                if file.tell() == 0:
+                    file.write(MAGIC)
+                else:
+                    # Drop a partial record left by an interrupted append
+                    file.truncate(HEADER_SIZE + self.record_count() * RECORD.size)
+                first_record = self.record_count()
+                file.write(b"".join(chunks))
+                file.flush()
+                os.fsync(file.fileno())
+
+            self._extend_index(first_record, [RECORD.unpack(chunk)[0] for chunk in chunks])
+
+    def _extend_index(self, first_record, days):
+        """Add index entries for records appended from ``first_record`` on."""
+        try:
+            with open(self.index_path, 'rb') as file:
+                header = file.read(len(INDEX_MAGIC))
+                file.seek(0, os.SEEK_END)
+                size = file.tell()
+                entries = (size - len(INDEX_MAGIC)) // INDEX_ENTRY.size
+                last_day = None
+                if entries:
+                    file.seek(len(INDEX_MAGIC) + (entries - 1) * INDEX_ENTRY.size)
+                    last_day = INDEX_ENTRY.unpack(file.read(INDEX_ENTRY.size))[0]
+        except FileNotFoundError:
+            self.rebuild_index()
+            return
+        if header != INDEX_MAGIC:
+            return
+
+        new_entries = []
+        for offset, day in enumerate(days):
+            if last_day is not None and day < last_day:
+                # Records are out of day order now; stop using the index
+                atomic_write_bytes(self.index_path, INDEX_DISABLED)
+                return
+            if day != last_day:
+                new_entries.append(INDEX_ENTRY.pack(day, first_record + offset))
+                last_day = day
+        with open(self.index_path, 'ab') as file:
+            file.truncate(len(INDEX_MAGIC) + entries * INDEX_ENTRY.size)
+            file.write(b"".join(new_entries))
+
+    def rebuild_index(self):
+        """Write the day index from the records, or mark it disabled if they are out of order."""
+        entries = []
+        last_day = None
+        for record_number, (day, _, _) in enumerate(RECORD.iter_unpack(self._record_bytes())):
+            if last_day is not None and day < last_day:
+                atomic_write_bytes(self.index_path, INDEX_DISABLED)
+                return
+            if day != last_day:
+                entries.append(INDEX_ENTRY.pack(day, record_number))
+                last_day = day
+        atomic_write_bytes(self.index_path, INDEX_MAGIC + b"".join(entries))
+
+    def _record_bytes(self):
+        count = self.record_count()
+        if count == 0:
+            return b""
+        with open(self.path, 'rb') as file:
+            file.seek(HEADER_SIZE)
+            return file.read(count * RECORD.size)
+
+    def changes_since(self, state):
+        """Return (reset, sessions, new_state) describing what changed after ``state``.
+
+        Records are only ever appended, so the state is a record count.
+        """
+        count = self.record_count()
+        if isinstance(state, dict) and "records" in state and state["records"] <= count:
+            sessions = self._to_sessions(self.columns(state["records"], count))
+            return False, sessions, {"records": count}
+        return True, self._to_sessions(self.columns(0, count)), {"records": count}
+
+
+def migrate_json_to_columnar(json_path, base_path):
+    """Copy every session of a JSON document into a columnar store.
+
+    Returns the number of sessions migrated.
+    """
+    # Write in day order so the day index can be used
+    sessions = sorted(iter_sessions(JsonStore(json_path).load()), key=lambda session: parse_date_str(session[0]))
+    ColumnarStore(base_path).save_sessions(sessions)
+    return len(sessions)
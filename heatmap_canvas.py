@@ -0,0 +1,124 @@
+# heatmap_canvas.py
+
+import tkinter as tk
+from datetime import datetime, timedelta
+
+from heatmap_colors import COLORS
+from storage import DATE_FORMAT, JsonStore
+
+
+class CanvasHeatmapView:
+    """Draw the focus time heatmap as plain Tk canvas rectangles.
+
+    A lightweight alternative to HeatmapView that needs neither pandas nor
+    matplotlib. Each day keeps its rectangle, so refreshing a day is a single
+    ``itemconfig`` call.
+    """
+
+    CELL_SIZE = 14
+    CELL_GAP = 2
+    MONTH_GAP = 4
+    MARGIN = 20
+    TITLE_HEIGHT = 30
+
+    def __init__(self, root, store=None):
+        self.frame = tk.Frame(root)
+        self.store = store if store is not None else JsonStore("productivity_data.json")
+
+        # Load and prepare data for the past year only
+        self.end_date = datetime.now().date()
+        self.start_date = self.end_date - timedelta(days=365)
+        data = self.store.load_range(self.start_date, self.end_date)
+        self.totals = {}
+        for date_str, day in data.items():
+            date = datetime.strptime(date_str, DATE_FORMAT).date()
+            self.totals[date] = sum(day.values())
+
+        self.cells = {}
+        self.draw_heatmap()
+
+    def first_week_offset(self):
+        """Return how many days the first displayed week starts before start_date."""
+        return (self.start_date.weekday() + 1) % 7
+
+    def cell_for_date(self, date):
+        """Return the (row, column) of the heatmap cell showing the given date."""
+        week, weekday = divmod((date - self.start_date).days + self.first_week_offset(), 7)
+        return weekday, week
+
+    def draw_heatmap(self):
+        """Create one rectangle per day plus the title and month labels."""
+        n_days = (self.end_date - self.start_date).days + 1
+        n_weeks = (self.first_week_offset() + n_days + 6) // 7
+        first_week_start = self.start_date - timedelta(days=self.first_week_offset())
+
+        # Widen the gap before each week that starts a month
+        column_x = []
+        month_labels = []
+        x = self.MARGIN
+        for week in range(n_weeks):
+            week_start_date = first_week_start + timedelta(weeks=week)
+            if week_start_date.day <= 7:  # Rough approximation of month starts
+                if week > 0:
+                    x += self.MONTH_GAP
+                month_labels.append((x, week_start_date.strftime('%b')))
+            column_x.append(x)
+            x += self.CELL_SIZE + self.CELL_GAP
+
+        grid_top = self.MARGIN + self.TITLE_HEIGHT
+        grid_bottom = grid_top + 7 * (self.CELL_SIZE + self.CELL_GAP)
+        self.canvas = tk.Canvas(self.frame, width=x + self.MARGIN, height=grid_bottom + 2 * self.MARGIN,
+                                background='white', highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+
+        self.canvas.create_text((x + self.MARGIN) / 2, self.MARGIN + self.TITLE_HEIGHT / 2,
+                                text='Focus Time Heatmap (Past Year)')
+        for label_x, label in month_labels:
+            self.canvas.create_text(label_x, grid_bottom + self.MARGIN / 2, text=label, anchor=tk.W)
+
+        for offset in range(n_days):
+            date = self.start_date + timedelta(days=offset)
+            row, column = self.cell_for_date(date)
+            left = column_x[column]
+            top = grid_top + row * (self.CELL_SIZE + self.CELL_GAP)
+            self.cells[date] = self.canvas.create_rectangle(
+                left, top, left + self.CELL_SIZE, top + self.CELL_SIZE, width=0)
+
+        self.recolor()
+
+    def update_scale(self):
+        """Recompute the color scale the same way HeatmapView does."""
+        values = [self.totals.get(date, 0) for date in self.cells]
+        self.vmin = min(values)
+        self.vmax = max(values)
+        if self.vmin == self.vmax:
+            self.vmin = 0
+            self.vmax = 1
+
+    def color_for(self, value):
+        """Return the bucket color for a daily total, like a 4-color listed colormap."""
+        fraction = (value - self.vmin) / (self.vmax - self.vmin)
+        return COLORS[max(0, min(int(fraction * len(COLORS)), len(COLORS) - 1))]
+
+    def recolor(self):
+        """Recolor every cell after the color scale changed."""
+        self.update_scale()
+        for date, item in self.cells.items():
+            self.canvas.itemconfig(item, fill=self.color_for(self.totals.get(date, 0)))
+
+    def refresh(self, date):
+        """Re-read one day from the store and recolor only its cell.
+
+        Returns False if the date is outside the displayed window.
+        """
+        if date not in self.cells:
+            return False
+
+        day = self.store.load_range(date, date).get(date.strftime(DATE_FORMAT), {})
+        self.totals[date] = sum(day.values())
+
+        if self.totals[date] > self.vmax:
+            self.recolor()
+        else:
+            self.canvas.itemconfig(self.cells[date], fill=self.color_for(self.totals[date]))
+        return True
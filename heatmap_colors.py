@@ -0,0 +1,5 @@
+# heatmap_colors.py
+
+# Palette shared by the heatmap renderers, lowest bucket first
+# 0 - 1, 1 - 3, 3 - 5, 5 - 7, 7+
+COLORS = ["#D3D3D3", "#25A244", "#1A7431", "#10451D"]
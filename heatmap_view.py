@@ -1,84 +1,97 @@
 import tkinter as tk
-import json
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime, timedelta
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+from heatmap_colors import COLORS
+from storage import DATE_FORMAT, JsonStore
+
 
 class HeatmapView:
-    def __init__(self, root):
+    def __init__(self, root, store=None):
         # Create a frame for the heatmap view
         self.frame = tk.Frame(root)
+        self.store = store if store is not None else JsonStore("productivity_data.json")
 
-        # Load and prepare data
-        data = self.load_data("productivity_data.json")
-        df = self.prepare_data_for_heatmap(data)
+        # Load and prepare data for the past year only
+        self.end_date = datetime.now().date()
+        self.start_date = self.end_date - timedelta(days=365)
+        data = self.load_data(self.start_date, self.end_date)
+        pivot_table = self.prepare_data_for_heatmap(data)
 
         # Plot the heatmap
-        self.plot_heatmap(df)
+        self.plot_heatmap(pivot_table)
+
+    def load_data(self, start_date, end_date):
+        """Load productivity data for the displayed date window from the store."""
+        return self.store.load_range(start_date, end_date)
 
-    def load_data(self, file_path):
-        """Load productivity data from JSON file."""
-        try:
-            with open(file_path, 'r') as file:
-                data = json.load(file)
-            return data
-        except FileNotFoundError:
-            return {}
+    def first_week_offset(self):
+        """Return how many days the first displayed week starts before start_date.
 
-    def parse_date(self, date_str):
-        """Parse date string into a datetime object."""
-        return datetime.strptime(date_str, "%d.%m.%Y")
+        Weeks start on Sunday, as with the '%U' week numbers.
+        """
+        return (self.start_date.weekday() + 1) % 7
 
     def prepare_data_for_heatmap(self, data):
-        """Prepare data for heatmap visualization."""
-        focus_data = []
-        for date_str, sessions in data.items():
-            total_focus_duration = sum(session['focus_duration'] for session in sessions)
-            focus_data.append((self.parse_date(date_str), total_focus_duration))
-
-        # Create a DataFrame from the focus data
-        df = pd.DataFrame(focus_data, columns=["date", "focus_duration"])
-        df.set_index("date", inplace=True)
-
-        # Resample to ensure all days of the past year are included
-        start_date = datetime.now().date() - timedelta(days=365)
-        end_date = datetime.now().date()
-        df = df.reindex(pd.date_range(start_date, end_date, freq='D')).fillna(0)
-        df['focus_duration'] = df['focus_duration'].astype(int)
-        return df
-
-    def plot_heatmap(self, df):
+        """Prepare the weekday-by-week grid of daily focus totals for the heatmap."""
+        n_days = (self.end_date - self.start_date).days + 1
+        lead = self.first_week_offset()
+        n_weeks = (lead + n_days + 6) // 7
+
+        daily = np.zeros(n_days, dtype=np.int64)
+        if data:
+            # Parse every date key in one batch and turn it into a day offset
+            dates = pd.to_datetime(pd.Index(list(data.keys())), format=DATE_FORMAT)
+            offsets = (dates.values.astype('datetime64[D]')
+                       - np.datetime64(self.start_date, 'D')).astype(np.int64)
+            totals = np.fromiter(
+                (sum(day.values()) for day in data.values()),
+                dtype=np.int64, count=len(data))
+            in_window = (offsets >= 0) & (offsets < n_days)
+            daily = np.bincount(offsets[in_window], weights=totals[in_window],
+                                minlength=n_days).astype(np.int64)
+
+        # Lay the days out week by week; cells outside the window stay empty
+        cells = np.full(n_weeks * 7, np.nan)
+        cells[lead:lead + n_days] = daily
+        return pd.DataFrame(cells.reshape(n_weeks, 7).T,
+                            index=pd.RangeIndex(7, name='weekday'),
+                            columns=pd.RangeIndex(n_weeks, name='week'))
+
+    def plot_heatmap(self, pivot_table):
         """Plot the focus time heatmap."""
-        # Prepare data for heatmap visualization
-        df['week'] = df.index.to_series().apply(lambda x: x.strftime('%U'))
-        df['weekday'] = df.index.weekday
-        print(df)
+        self.build_figure(pivot_table)
 
-        # Create a pivot table for the heatmap
-        pd.set_option('display.max_columns', 60)
-        pivot_table = df.pivot(index='weekday', columns='week', values='focus_duration')
-        print(pivot_table.head(10))
+        # Embed the plot into the Tkinter canvas
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self.frame)
+        self.canvas.draw()
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
+    def build_figure(self, pivot_table):
+        """Draw the heatmap into a new matplotlib figure, without any Tk widget."""
         # Plot the heatmap
         fig, ax = plt.subplots(figsize=(14, 3))  # Adjust figsize to make it more rectangular like GitHub
 
-        # 0 - 1, 1 - 3, 3 - 5, 5 - 7, 7+
-        colors = ["#D3D3D3", "#25A244", "#1A7431", "#10451D"]
         # Define a colormap that shows low values as grey
-        cmap = sns.color_palette(colors, as_cmap=True)
+        cmap = sns.color_palette(COLORS, as_cmap=True)
 
         # Calculate vmin and vmax based on the data
-        vmin = pivot_table.values.min()
-        vmax = pivot_table.values.max()
+        vmin = np.nanmin(pivot_table.values)
+        vmax = np.nanmax(pivot_table.values)
 
         # Ensure vmin < vmax
         if vmin == vmax:
             vmin = 0
             vmax = 1
 
+        self.pivot_table = pivot_table
+        self.vmin = vmin
+        self.vmax = vmax
+
         sns.heatmap(
             pivot_table,
             cmap=cmap,
@@ -96,20 +109,22 @@ class HeatmapView:
         ax.set_ylabel('')
 
         # Set x-ticks for each month start
-        start_date = df.index.min()
+        first_week_start = self.start_date - timedelta(days=self.first_week_offset())
         month_labels = []
         month_positions = []
 
         for i, week in enumerate(pivot_table.columns):
             # Calculate week start date
-            week_start_date = start_date + timedelta(weeks=int(week))
+            week_start_date = first_week_start + timedelta(weeks=int(week))
             if week_start_date.day <= 7:  # Rough approximation of month starts
                 month_labels.append(week_start_date.strftime('%b'))
                 month_positions.append(i)
 
         # Add spaces between months by creating 'empty' columns in pivot table
-        for position in month_positions:
+        self.month_separators = [
             ax.axvline(x=position - 0.5, color='white', linewidth=2)  # Slight line for visual separation
+            for position in month_positions
+        ]
 
         ax.set_xticks(month_positions)
         ax.set_xticklabels(month_labels, rotation=45, ha='right')
@@ -118,7 +133,48 @@ class HeatmapView:
         plt.xlabel('Month')
         plt.tight_layout()
 
-        # Embed the plot into the Tkinter canvas
-        canvas = FigureCanvasTkAgg(fig, master=self.frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # Keep the artists around so single cells can be updated later
+        self.figure = fig
+        self.ax = ax
+        self.mesh = ax.collections[0]
+
+    def cell_for_date(self, date):
+        """Return the (row, column) of the heatmap cell showing the given date."""
+        week, weekday = divmod((date - self.start_date).days + self.first_week_offset(), 7)
+        return weekday, week
+
+    def refresh(self, date):
+        """Re-read one day from the store and redraw only its cell.
+
+        Returns False if the date is outside the displayed window.
+        """
+        if not self.start_date <= date <= self.end_date:
+            return False
+
+        day = self.load_data(date, date).get(date.strftime(DATE_FORMAT), {})
+        total_focus_duration = sum(day.values())
+
+        row, column = self.cell_for_date(date)
+        self.pivot_table.iat[row, column] = total_focus_duration
+
+        # Update the color array of the existing mesh in place
+        values = self.mesh.get_array()
+        if values.ndim == 2:
+            values[row, column] = total_focus_duration
+        else:
+            values[row * self.pivot_table.shape[1] + column] = total_focus_duration
+        self.mesh.set_array(values)
+
+        if total_focus_duration > self.vmax:
+            # The color scale changed, so every cell needs recoloring
+            self.vmax = total_focus_duration
+            self.mesh.set_clim(self.vmin, self.vmax)
+            self.canvas.draw_idle()
+        else:
+            # Blit just the heatmap axes instead of re-rendering the figure; the month
+            # separators lie on top of the mesh, so they are redrawn after it
+            self.ax.draw_artist(self.mesh)
+            for line in self.month_separators:
+                self.ax.draw_artist(line)
+            self.canvas.blit(self.ax.bbox)
+        return True
@@ -0,0 +1,68 @@
+# icons.py
+
+import base64
+import io
+import os
+import tkinter as tk
+
+from storage import atomic_write_bytes
+
+# Icon name -> (source image, size in pixels at 1x)
+ICONS = {
+    'play': ("images/play.png", 15),
+    'pause': ("images/pause.png", 15),
+    'calendar': ("images/calendar.png", 20),
+    'timer': ("images/timer.png", 20),
+}
+CACHE_DIR = "images/.cache"
+
+
+def display_scale(root):
+    """Return the integer HiDPI scale of the display (1 on a 96 DPI screen)."""
+    # Tk reports pixels per point; 96 DPI is 4/3
+    return max(1, round(float(root.tk.call('tk', 'scaling')) * 0.75))
+
+
+def cache_path(name, size, scale, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{name}-{size}@{scale}x.png")
+
+
+def resize_png(source, pixels):
+    """Return PNG bytes of ``source`` resampled to ``pixels`` square. Needs Pillow."""
+    from PIL import Image
+
+    output = io.BytesIO()
+    Image.open(source).resize((pixels, pixels), Image.Resampling.LANCZOS).save(output, format="PNG")
+    return output.getvalue()
+
+
+def load_icon(root, name, source, size, scale=1, cache_dir=CACHE_DIR):
+    """Return a Tk PhotoImage of the icon resized to ``size * scale`` pixels.
+
+    Resized icons are cached as PNG files that Tk reads natively. A cached
+    file carries the modification time of its source, so editing the source
+    makes it stale. Only a cache miss imports Pillow to resample.
+    """
+    path = cache_path(name, size, scale, cache_dir)
+    source_mtime = os.stat(source).st_mtime_ns
+    try:
+        if os.stat(path).st_mtime_ns == source_mtime:
+            return tk.PhotoImage(master=root, file=path)
+    except (FileNotFoundError, tk.TclError):
+        pass
+
+    png = resize_png(source, size * scale)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        atomic_write_bytes(path, png)
+        os.utime(path, ns=(source_mtime, source_mtime))
+    except OSError:
+        pass  # A read-only install still gets the icon, just not the cache
+    return tk.PhotoImage(master=root, data=base64.b64encode(png))
+
+
+def load_icons(root, icons=ICONS, cache_dir=CACHE_DIR):
+    """Return {name: PhotoImage} for every icon, at the display's scale."""
+    scale = display_scale(root)
+    return {name: load_icon(root, name, source, size, scale, cache_dir)
+            for name, (source, size) in icons.items()}
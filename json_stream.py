@@ -0,0 +1,80 @@
+# json_stream.py
+
+import json
+import re
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"[ \t\n\r]*")
+# Characters that may continue a number the decoder has already accepted
+_number_tail = frozenset("0123456789.eE+-")
+
+
+def iter_object(file, chunk_size=CHUNK_SIZE):
+    """Yield the (key, value) pairs of a top-level JSON object one at a time.
+
+    The file is read in chunks and each value is decoded as soon as it is
+    complete, so memory stays bounded by the chunk size and the largest single
+    value instead of growing with the document. Stopping the iteration early
+    stops reading.
+    """
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def read_more():
+        nonlocal buffer, pos, eof
+        chunk = file.read(chunk_size)
+        if not chunk:
+            eof = True
+            return
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            pos = _whitespace.match(buffer, pos).end()
+            if pos < len(buffer) or eof:
+                return
+            read_more()
+
+    def expect(characters):
+        nonlocal pos
+        skip_whitespace()
+        if pos >= len(buffer) or buffer[pos] not in characters:
+            raise json.JSONDecodeError(f"Expecting one of {characters!r}", buffer, pos)
+        pos += 1
+        return buffer[pos - 1]
+
+    def decode_value():
+        nonlocal pos
+        skip_whitespace()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # A number cut at the end of the buffer, even just before "." or "e", may
+                # continue in the next chunk
+                cut = type(value) in (int, float) and (end == len(buffer) or buffer[end] in _number_tail)
+                if eof or not cut:
+                    pos = end
+                    return value
+            read_more()
+
+    expect("{")
+    skip_whitespace()
+    if buffer.startswith("}", pos):
+        return
+    while True:
+        key = decode_value()
+        if not isinstance(key, str):
+            raise json.JSONDecodeError("Expecting a string key", buffer, pos)
+        expect(":")
+        yield key, decode_value()
+        if expect(",}") == "}":
+            return
@@ -1,10 +1,24 @@
 # main.py
 
+import importlib
+import os
+import queue
+import threading
 import tkinter as tk
-from tkinter import ttk
-from PIL import Image, ImageTk
+from tkinter import messagebox, ttk
+from icons import load_icons
+from notifier import NotificationDispatcher
+from persistence import PersistenceWorker
+from rollup import RollupCache
+from storage import open_store
+from timer_daemon import RemoteEngine, TimerClient
 from timer_view import TimerView
-from heatmap_view import HeatmapView
+
+# Heatmap renderers selectable at startup: module and class name
+HEATMAP_RENDERERS = {
+    "matplotlib": ("heatmap_view", "HeatmapView"),
+    "canvas": ("heatmap_canvas", "CanvasHeatmapView"),
+}
 
 
 class ProductivityApp:
@@ -12,19 +26,38 @@ class ProductivityApp:
         self.root = root
         self.root.title("Productivity Tracker")
 
-        # Load images
-        self.images = {
-            'play': ImageTk.PhotoImage(Image.open("images/play.png").resize((15, 15),
-                                                                            Image.Resampling.LANCZOS)),
-            'pause': ImageTk.PhotoImage(Image.open("images/pause.png").resize((15, 15), Image.Resampling.LANCZOS)),
-            'calendar': ImageTk.PhotoImage(
-                Image.open("images/calendar.png").resize((20, 20), Image.Resampling.LANCZOS)),
-            'timer': ImageTk.PhotoImage(Image.open("images/timer.png").resize((20, 20), Image.Resampling.LANCZOS)),
-        }
+        # Load images, resized once and cached as PNGs Tk reads without Pillow
+        self.images = load_icons(self.root)
+
+        # Storage mode: "json" (single document), "journal" (append-only), "sqlite"
+        # "partitioned" (one document per month) or "columnar" (binary records)
+        self.storage_mode = os.environ.get("PRODUCTIVITY_STORAGE", "json")
+        self.store = open_store(self.storage_mode)
+        # Sessions are written off the Tk thread
+        self.writer = PersistenceWorker(self.store)
+        # Desktop notifications are delivered off the Tk thread as well
+        self.notifier = NotificationDispatcher()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Attach to a running timer daemon if there is one, otherwise run the timer in-process
+        self.pending_calls = queue.SimpleQueue()
+        self.root.bind("<<CallSoon>>", self.run_pending_calls)
+        self.engine = None
+        client = TimerClient(os.environ.get("PRODUCTIVITY_SOCKET"))
+        if client.is_running():
+            self.engine = RemoteEngine(client, self.call_soon, on_error=self.on_daemon_error)
 
         # Initialize frames
-        self.timer_view = TimerView(self.root, self.images, self.show_frame)
-        self.heatmap_view = HeatmapView(self.root)
+        self.timer_view = TimerView(self.root, self.images, self.show_frame, store=self.writer,
+                                    session_callback=self.on_session_saved, notifier=self.notifier,
+                                    engine=self.engine)
+        # Heatmap renderer: "matplotlib" (seaborn figure) or "canvas" (plain Tk)
+        self.heatmap_renderer = HEATMAP_RENDERERS[os.environ.get("PRODUCTIVITY_HEATMAP", "matplotlib")]
+        # The heatmap may pull in pandas/matplotlib/seaborn, so it is built on first use
+        self.heatmap_view = None
+        self.rollup = None
+        # Days with sessions saved since the heatmap was last shown
+        self.changed_dates = set()
 
         # Button to toggle views
         self.view_toggle_button = ttk.Button(self.root, image=self.images['calendar'], command=self.toggle_view)
@@ -33,19 +66,106 @@ class ProductivityApp:
         # Show Timer Frame by default
         self.show_frame(self.timer_view.frame)
 
+        # Once the first frame has painted, import the heatmap stack in the background
+        self.root.after_idle(self.prewarm_heatmap)
+
+    def call_soon(self, func):
+        """Run func on the Tk thread; safe to call from other threads."""
+        self.pending_calls.put(func)
+        self.root.event_generate("<<CallSoon>>", when="tail")
+
+    def run_pending_calls(self, event=None):
+        """Run the functions queued by call_soon."""
+        while True:
+            try:
+                func = self.pending_calls.get_nowait()
+            except queue.Empty:
+                return
+            func()
+
+    def on_daemon_error(self, error):
+        """Tell the user the timer daemon could not run a command."""
+        messagebox.showerror("Productivity Tracker", f"The timer daemon could not run the command:\n{error}")
+
+    def prewarm_heatmap(self):
+        """Import the heatmap module off the Tk thread so the first toggle is fast."""
+        module_name = self.heatmap_renderer[0]
+        threading.Thread(target=importlib.import_module, args=(module_name,), daemon=True).start()
+
+    def get_heatmap_view(self):
+        """Return the heatmap view, creating it on first use."""
+        if self.heatmap_view is None:
+            module_name, class_name = self.heatmap_renderer
+            view_class = getattr(importlib.import_module(module_name), class_name)
+            self.writer.flush()
+            self.heatmap_view = view_class(self.root, store=self.get_heatmap_store())
+        return self.heatmap_view
+
+    def get_heatmap_store(self):
+        """Return what the heatmap reads from.
+
+        That is precomputed daily totals kept up to date incrementally, unless
+        the store can already read a date range through an on-disk index. The
+        cache is only parsed here, when the heatmap is first shown.
+        """
+        if getattr(self.store, "indexed_reads", False):
+            return self.store
+        self.rollup = RollupCache(self.store, f"productivity_data.{self.storage_mode}.rollup.json")
+        return self.rollup
+
+    def on_session_saved(self, date):
+        """Remember a day whose heatmap cell is now out of date."""
+        if self.heatmap_view is not None:
+            self.changed_dates.add(date)
+
+    def refresh_heatmap(self):
+        """Redraw the heatmap cells of days changed since it was last shown."""
+        if not self.changed_dates:
+            return
+        self.writer.flush()
+        for date in sorted(self.changed_dates):
+            self.heatmap_view.refresh(date)
+        self.changed_dates.clear()
+
     def toggle_view(self):
         """Toggle between the timer and heatmap views."""
         if self.timer_view.frame.winfo_ismapped():
-            self.show_frame(self.heatmap_view.frame)
+            self.show_frame(self.get_heatmap_view().frame)
+            self.refresh_heatmap()
             self.view_toggle_button.config(image=self.images['timer'])
         else:
             self.show_frame(self.timer_view.frame)
             self.view_toggle_button.config(image=self.images['calendar'])
 
+    def on_close(self):
+        """Write pending sessions before closing the window."""
+        while True:
+            try:
+                self.writer.flush()
+                break
+            except Exception as error:
+                if not messagebox.askretrycancel(
+                        "Productivity Tracker", f"Your latest sessions could not be saved:\n{error}"):
+                    break
+        if self.engine is not None:
+            self.engine.close()
+        try:
+            self.writer.close()
+        except Exception:
+            pass  # The user chose to close without saving
+        if self.rollup is not None:
+            try:
+                self.rollup.close()
+            except OSError:
+                pass  # Only a cache; its delta log is replayed next time
+        self.notifier.close()
+        self.root.destroy()
+
     def show_frame(self, frame):
         """Show the specified frame."""
         self.timer_view.frame.pack_forget()
-        self.heatmap_view.frame.pack_forget()
+        if self.heatmap_view is not None:
+            self.heatmap_view.frame.pack_forget()
         frame.pack(expand=True, fill='both')
 
 
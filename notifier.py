@@ -0,0 +1,101 @@
+# notifier.py
+
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def plyer_sink(title, message, timeout):
+    """Show a desktop notification through plyer."""
+    from plyer import notification
+    notification.notify(title=title, message=message, timeout=timeout)
+
+
+class NotificationDispatcher:
+    """Deliver desktop notifications from a worker thread.
+
+    ``post`` never blocks the caller. A notification identical to one still
+    waiting is coalesced into it, one that waited longer than ``max_age``
+    seconds is dropped as stale, and when the queue is full the new one is
+    dropped. A sink call taking more than ``delivery_timeout`` seconds is
+    abandoned so a hung notification daemon cannot hold up later ones.
+    ``sink(title, message, timeout)`` can be replaced, e.g. by a stub in tests.
+    """
+
+    def __init__(self, sink=plyer_sink, max_queued=8, max_age=30.0, delivery_timeout=5.0):
+        self.sink = sink
+        self.max_age = max_age
+        self.delivery_timeout = delivery_timeout
+        # Seconds from post to the sink returning, for the last delivery
+        self.last_latency = None
+        self.delivered = 0
+        self.dropped = 0
+        self.max_queued = max_queued
+        self._queue = queue.Queue()
+        self._waiting = set()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="notification-dispatcher", daemon=True)
+        self._thread.start()
+
+    def post(self, title, message, timeout=10):
+        """Queue a notification; returns False if it was coalesced or dropped."""
+        key = (title, message, timeout)
+        with self._lock:
+            if key in self._waiting:
+                return False
+            if len(self._waiting) >= self.max_queued:
+                self.dropped += 1
+                return False
+            self._waiting.add(key)
+            self._queue.put((key, time.monotonic()))
+        return True
+
+    def flush(self, timeout=None):
+        """Wait until every queued notification was delivered or dropped.
+
+        Returns False if the timeout expired first.
+        """
+        done = threading.Event()
+        self._queue.put((None, done))
+        return done.wait(timeout)
+
+    def close(self):
+        """Stop the worker; notifications still queued are discarded."""
+        self._queue.put((None, None))
+
+    def _run(self):
+        while True:
+            key, payload = self._queue.get()
+            if key is None:
+                if payload is None:
+                    return
+                payload.set()
+                continue
+
+            with self._lock:
+                self._waiting.discard(key)
+            posted_at = payload
+            if time.monotonic() - posted_at > self.max_age:
+                self.dropped += 1
+                continue
+            self._deliver(key, posted_at)
+
+    def _deliver(self, key, posted_at):
+        def call_sink():
+            try:
+                self.sink(*key)
+            except Exception:
+                logger.exception("Notification sink failed")
+
+        delivery = threading.Thread(target=call_sink, name="notification-sink", daemon=True)
+        delivery.start()
+        delivery.join(self.delivery_timeout)
+        if delivery.is_alive():
+            logger.warning("Notification sink did not return within %.1fs", self.delivery_timeout)
+            self.dropped += 1
+            return
+        self.last_latency = time.monotonic() - posted_at
+        self.delivered += 1
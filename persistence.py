@@ -0,0 +1,110 @@
+# persistence.py
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+logger = logging.getLogger(__name__)
+
+
+class PersistenceWorker:
+    """Write sessions to a store from a background thread.
+
+    Sessions are queued by ``save_session`` and coalesced per day and activity
+    label, then written in one batch every ``flush_interval`` seconds, when
+    ``flush`` is called, or when the worker is closed. The worker exposes the
+    same ``save_session`` signature as the stores so it can be used in their place.
+    """
+
+    def __init__(self, store, flush_interval=2.0, max_queued=256):
+        self.store = store
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._pending = {}
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="persistence-worker", daemon=True)
+        self._thread.start()
+
+    def save_session(self, date_str, activity_label, focus_duration):
+        """Queue a session for writing; blocks only if the queue is full."""
+        if self._closed:
+            raise RuntimeError("PersistenceWorker is closed")
+        self._queue.put(("session", (date_str, activity_label, focus_duration)))
+
+    def flush(self, timeout=None):
+        """Wait until every session queued so far has been written.
+
+        Returns False if the timeout expired first. If the store failed to
+        write them, its exception is raised; the sessions stay queued and are
+        retried on the next write.
+        """
+        done = Future()
+        self._queue.put(("flush", done))
+        return self._wait(done, timeout)
+
+    def close(self, timeout=None):
+        """Write any pending sessions and stop the worker thread.
+
+        Returns False if the timeout expired first. If the final write
+        failed, the store's exception is raised, since those sessions are lost.
+        """
+        if self._closed:
+            return True
+        self._closed = True
+        done = Future()
+        self._queue.put(("stop", done))
+        return self._wait(done, timeout)
+
+    @staticmethod
+    def _wait(done, timeout):
+        try:
+            done.result(timeout)
+        except TimeoutError:
+            return False
+        return True
+
+    def _run(self):
+        deadline = None
+        while True:
+            try:
+                wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+                kind, payload = self._queue.get(timeout=wait)
+            except queue.Empty:
+                self._write_pending()
+                deadline = None
+                continue
+
+            if kind == "session":
+                date_str, activity_label, focus_duration = payload
+                key = (date_str, activity_label)
+                self._pending[key] = self._pending.get(key, 0) + focus_duration
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            elif kind in ("flush", "stop"):
+                error = self._write_pending()
+                deadline = None
+                if error is None:
+                    payload.set_result(None)
+                else:
+                    payload.set_exception(error)
+                if kind == "stop":
+                    return
+
+    def _write_pending(self):
+        """Write the coalesced sessions; returns the store's exception if that failed."""
+        if not self._pending:
+            return None
+        sessions = [
+            (date_str, activity_label, focus_duration)
+            for (date_str, activity_label), focus_duration in self._pending.items()
+        ]
+        try:
+            self.store.save_sessions(sessions)
+        except Exception as error:
+            # Keep the sessions queued and retry on the next flush
+            logger.exception("Failed to write %d session(s)", len(sessions))
+            return error
+        self._pending.clear()
+        return None
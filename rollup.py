@@ -0,0 +1,141 @@
+# rollup.py
+
+import json
+import os
+import sys
+import uuid
+from datetime import datetime
+
+from storage import DATE_FORMAT, _truncate_torn_tail, atomic_write_json
+
+ROLLUP_VERSION = 2
+
+
+class RollupCache:
+    """Keep precomputed per-day and per-label totals of a store in a cache file.
+
+    The cache remembers the store state it was built from. On each read only
+    the sessions the store reports as added since that state are folded in,
+    and the whole cache is rebuilt only when the store cannot tell. It offers
+    the read side of a store, so views can use it in place of one.
+
+    Folded-in sessions are appended to a delta log next to the cache file, so
+    a refresh costs what changed rather than the whole history. The log is
+    compacted into the cache file by ``close`` and when a long log is found
+    on opening; it only applies to the cache generation named in its header.
+
+    The cache records the kind of store it was built from; a cache left by
+    another storage mode is discarded, since its state means nothing to this
+    store.
+    """
+
+    # Delta log entries found on opening that trigger a compaction
+    COMPACT_AFTER = 200
+
+    def __init__(self, store, path):
+        self.store = store
+        self.path = path
+        self.log_path = path + ".log"
+        self.store_kind = type(store).__name__
+        self.state = None
+        self.generation = None
+        self.logged = 0  # Delta log entries not yet compacted into the cache file
+        # ISO date -> {activity_label: focus_duration}
+        self.days = {}
+        self._read_cache()
+
+    def _read_cache(self):
+        try:
+            with open(self.path, 'r') as file:
+                cache = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if cache.get("version") != ROLLUP_VERSION or cache.get("store") != self.store_kind:
+            return
+        self.state = cache["state"]
+        self.generation = cache["generation"]
+        self.days = {
+            iso_date: {sys.intern(label): minutes for label, minutes in labels.items()}
+            for iso_date, labels in cache["days"].items()
+        }
+        if not self._replay_log() or self.logged >= self.COMPACT_AFTER:
+            self._write_cache()
+
+    def _replay_log(self):
+        # Fold in the delta log; returns False if it ends in a line that cannot be read
+        try:
+            with open(self.log_path, 'r') as file:
+                lines = file.read().splitlines()
+        except FileNotFoundError:
+            return True
+        try:
+            header = json.loads(lines[0]) if lines else {}
+        except json.JSONDecodeError:
+            header = {}
+        if header.get("generation") != self.generation:
+            return True  # Left over from before the last compaction
+        for line in lines[1:]:
+            try:
+                delta = json.loads(line)
+            except json.JSONDecodeError:
+                return False  # Torn by an interrupted append
+            self._fold(delta["sessions"])
+            self.state = delta["state"]
+            self.logged += 1
+        return True
+
+    def _fold(self, sessions):
+        for date_str, activity_label, focus_duration in sessions:
+            iso_date = datetime.strptime(date_str, DATE_FORMAT).date().isoformat()
+            labels = self.days.setdefault(iso_date, {})
+            activity_label = sys.intern(activity_label)
+            labels[activity_label] = labels.get(activity_label, 0) + focus_duration
+
+    def _write_cache(self):
+        # A new generation, so a delta log left by a crash before the unlink is not applied twice
+        self.generation = uuid.uuid4().hex
+        atomic_write_json(self.path, {"version": ROLLUP_VERSION, "store": self.store_kind,
+                                      "generation": self.generation, "state": self.state, "days": self.days})
+        if os.path.exists(self.log_path):
+            os.unlink(self.log_path)
+        self.logged = 0
+
+    def _append_delta(self, sessions):
+        _truncate_torn_tail(self.log_path)
+        lines = []
+        if self.logged == 0:
+            lines.append(json.dumps({"generation": self.generation}) + "\n")
+        lines.append(json.dumps({"state": self.state, "sessions": sessions}) + "\n")
+        with open(self.log_path, 'w' if self.logged == 0 else 'a') as file:
+            file.write("".join(lines))
+        self.logged += 1
+
+    def sync(self):
+        """Fold in sessions saved since the cache was written and persist them."""
+        reset, sessions, new_state = self.store.changes_since(self.state)
+        if not reset and not sessions and new_state == self.state:
+            return
+        if reset:
+            self.days = {}
+        self._fold(sessions)
+        self.state = new_state
+        if reset:
+            self._write_cache()
+        else:
+            self._append_delta(sessions)
+
+    def close(self):
+        """Compact the delta log into the cache file."""
+        if self.logged:
+            self._write_cache()
+
+    def load_range(self, start_date, end_date):
+        """Return the per-day view for the days between start_date and end_date."""
+        self.sync()
+        start, end = start_date.isoformat(), end_date.isoformat()
+        data = {}
+        for iso_date, labels in self.days.items():
+            if start <= iso_date <= end:
+                date_str = datetime.strptime(iso_date, "%Y-%m-%d").strftime(DATE_FORMAT)
+                data[date_str] = dict(labels)
+        return data
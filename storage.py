@@ -0,0 +1,742 @@
+# storage.py
+
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from contextlib import closing, contextmanager
+from datetime import datetime
+
+from json_stream import iter_object
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; stores fall back to unlocked access
+    fcntl = None
+
+DATE_FORMAT = "%d.%m.%Y"
+
+
+def parse_date_str(date_str):
+    """Parse a stored date key into a date object."""
+    return datetime.strptime(date_str, DATE_FORMAT).date()
+
+
+def filter_range(data, start_date, end_date):
+    """Keep only the days of the per-day view within [start_date, end_date]."""
+    return {
+        date_str: sessions for date_str, sessions in data.items()
+        if start_date <= parse_date_str(date_str) <= end_date
+    }
+
+
+def add_session(data, date_str, activity_label, focus_duration):
+    """Merge a session into the per-day view ``{date_str: {activity_label: minutes}}``.
+
+    Labels are interned, so every day of a view shares one string per label.
+    """
+    activity_label = sys.intern(activity_label)
+    day = data.setdefault(date_str, {})
+    day[activity_label] = day.get(activity_label, 0) + focus_duration
+
+
+def label_map(sessions):
+    """Return a day's sessions as ``{activity_label: minutes}``.
+
+    Accepts the legacy list of ``{"activity_label", "focus_duration"}`` dicts
+    as well as the keyed map itself. Labels are interned like in add_session.
+    """
+    if isinstance(sessions, dict):
+        return {sys.intern(label): minutes for label, minutes in sessions.items()}
+    day = {}
+    for session in sessions:
+        label = sys.intern(session["activity_label"])
+        day[label] = day.get(label, 0) + session["focus_duration"]
+    return day
+
+
+def iter_sessions(data):
+    """Yield (date_str, activity_label, focus_duration) for every session of a per-day view."""
+    for date_str, day in data.items():
+        for activity_label, focus_duration in day.items():
+            yield date_str, activity_label, focus_duration
+
+
+def _file_identity(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive advisory lock tied to ``path`` for the duration of the block.
+
+    The lock lives on a separate ``.lock`` file so it survives the data file
+    being atomically replaced. It also excludes other threads of this process.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(path + ".lock", 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _truncate_torn_tail(path):
+    # Drop a partial last line left by an interrupted append so new lines start cleanly
+    # Only the last byte is read unless the file really ends mid-line, so appends stay constant time
+    try:
+        with open(path, 'rb+') as file:
+            end = file.seek(0, os.SEEK_END)
+            if end == 0:
+                return
+            file.seek(end - 1)
+            if file.read(1) == b"\n":
+                return
+            # Scan backwards block by block for the end of the last complete line
+            position = end
+            while position > 0:
+                start = max(0, position - 4096)
+                file.seek(start)
+                newline = file.read(position - start).rfind(b"\n")
+                if newline != -1:
+                    file.truncate(start + newline + 1)
+                    return
+                position = start
+            file.truncate(0)
+    except FileNotFoundError:
+        pass
+
+
+def atomic_write_json(path, data):
+    """Replace ``path`` with ``data`` so readers see either the old or the new document."""
+    atomic_write_bytes(path, json.dumps(data, indent=1).encode())
+
+
+def atomic_write_bytes(path, data):
+    """Replace the contents of ``path`` with ``data`` atomically and durably."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    _fsync_directory(directory)
+
+
+def _fsync_directory(directory):
+    # Persist the rename itself; not every platform allows opening directories
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class JsonStore:
+    """Store all sessions in a single JSON document keyed by date.
+
+    Each day maps activity labels to focus minutes; days in the legacy format
+    (a list of sessions) are read as well and rewritten keyed on checkpoint.
+
+    Saves are made durable by appending them to a small write-ahead log next
+    to the document. The log starts with a header identifying the document it
+    applies to, and every ``checkpoint_every`` sessions it is folded into the
+    document with an atomic replace. Replacing the document changes its
+    identity, so a log left behind by a crash after the replace is ignored
+    rather than applied twice. The last checkpointed log is kept as
+    ``.wal.prev``, ending with the identity of the document it went into, so
+    ``changes_since`` can carry on across a checkpoint.
+    """
+
+    def __init__(self, path, checkpoint_every=20):
+        self.path = path
+        self.wal_path = path + ".wal"
+        self.previous_wal_path = path + ".wal.prev"
+        self.checkpoint_every = checkpoint_every
+
+    def _document_identity(self):
+        return _file_identity(self.path)
+
+    def iter_document(self):
+        """Yield (date_str, {activity_label: minutes}) for each day of the document.
+
+        The document is parsed incrementally, one day at a time, so callers
+        that aggregate or filter never hold all of it in memory.
+        """
+        try:
+            file = open(self.path, 'r')
+        except FileNotFoundError:
+            return
+        with file:
+            for date_str, sessions in iter_object(file):
+                # Documents written before the keyed format hold a list of sessions per day
+                yield date_str, label_map(sessions)
+
+    def _read_document(self):
+        return dict(self.iter_document())
+
+    @staticmethod
+    def _read_log(path):
+        # Return the header of a log file and its records, or (None, []) if it has no valid header
+        try:
+            with open(path, 'r') as file:
+                lines = file.read().splitlines()
+        except FileNotFoundError:
+            return None, []
+        if not lines:
+            return None, []
+        try:
+            header = json.loads(lines[0])
+        except json.JSONDecodeError:
+            return None, []
+
+        records = []
+        for line in lines[1:]:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                break  # A torn final line from an interrupted append
+        return header, records
+
+    def _read_wal(self):
+        """Return the log records that still apply to the current document."""
+        header, records = self._read_log(self.wal_path)
+        if header is None or header.get("document") != self._document_identity():
+            return []  # Already checkpointed into the document
+        return records
+
+    def _read_previous_wal(self):
+        """Return the records of the last checkpointed log and the documents it went from and into."""
+        header, records = self._read_log(self.previous_wal_path)
+        if header is None or not records or "checkpoint" not in records[-1]:
+            return None, [], None
+        return header.get("document"), records[:-1], records[-1]["checkpoint"]
+
+    def load(self):
+        """Return the per-day view of all recorded sessions."""
+        data = self._read_document()
+        for record in self._read_wal():
+            add_session(data, record["date"], record["activity_label"], record["focus_duration"])
+        return data
+
+    def load_range(self, start_date, end_date):
+        """Return the per-day view for the days between start_date and end_date.
+
+        Only the days in range are kept while streaming through the document,
+        and reading stops once every day of the range has been seen.
+        """
+        data = {}
+        days_left = (end_date - start_date).days + 1
+        with closing(self.iter_document()) as days:
+            for date_str, day in days:
+                if start_date <= parse_date_str(date_str) <= end_date:
+                    data[date_str] = day
+                    days_left -= 1
+                    if days_left == 0:
+                        break  # Each date is a key of the document at most once
+        for record in self._read_wal():
+            if start_date <= parse_date_str(record["date"]) <= end_date:
+                add_session(data, record["date"], record["activity_label"], record["focus_duration"])
+        return data
+
+    def save_session(self, date_str, activity_label, focus_duration):
+        """Add a session to the given day."""
+        self.save_sessions([(date_str, activity_label, focus_duration)])
+
+    def save_sessions(self, sessions):
+        """Durably log several (date_str, activity_label, focus_duration) sessions.
+
+        Other processes may save concurrently: the log append happens under a
+        file lock and only reads the short log, and a checkpoint merges the log
+        into the document as re-read under the same lock.
+        """
+        with file_lock(self.path):
+            self._append_to_wal(sessions)
+
+    def _append_to_wal(self, sessions):
+        _truncate_torn_tail(self.wal_path)
+        pending = len(self._read_wal())
+        lines = []
+        if pending == 0:
+            lines.append(json.dumps({"document": self._document_identity()}) + "\n")
+        for date_str, activity_label, focus_duration in sessions:
+            lines.append(json.dumps({
+                "date": date_str,
+                "activity_label": activity_label,
+                "focus_duration": focus_duration,
+            }) + "\n")
+
+        with open(self.wal_path, 'w' if pending == 0 else 'a') as file:
+            file.write("".join(lines))
+            file.flush()
+            os.fsync(file.fileno())
+
+        if pending + len(sessions) >= self.checkpoint_every:
+            self._checkpoint()
+
+    def checkpoint(self):
+        """Fold the write-ahead log into the document and discard it."""
+        with file_lock(self.path):
+            self._checkpoint()
+
+    def _checkpoint(self):
+        records = self._read_wal()
+        if not records:
+            return
+        data = self._read_document()
+        for record in records:
+            add_session(data, record["date"], record["activity_label"], record["focus_duration"])
+        atomic_write_json(self.path, data)
+        # Keep the log, marked with the document it went into, for changes_since
+        with open(self.wal_path, 'a') as file:
+            file.write(json.dumps({"checkpoint": self._document_identity()}) + "\n")
+        os.replace(self.wal_path, self.previous_wal_path)
+
+    def changes_since(self, state):
+        """Return (reset, sessions, new_state) describing what changed after ``state``.
+
+        Sessions appended to the log since ``state`` are returned on their own,
+        also across one checkpoint, through the previous log. After more
+        checkpoints, or for an unknown state, every session is returned with
+        ``reset`` set.
+        """
+        identity = self._document_identity()
+        records = self._read_wal()
+        new_state = {"document": identity, "wal_records": len(records)}
+        if isinstance(state, dict) and isinstance(state.get("wal_records"), int):
+            position = state["wal_records"]
+            new_records = None
+            if state.get("document") == identity and position <= len(records):
+                new_records = records[position:]
+            else:
+                document, previous, checkpoint = self._read_previous_wal()
+                if document == state.get("document") and checkpoint == identity and position <= len(previous):
+                    new_records = previous[position:] + records
+            if new_records is not None:
+                sessions = [
+                    (record["date"], record["activity_label"], record["focus_duration"])
+                    for record in new_records
+                ]
+                return False, sessions, new_state
+
+        data = self._read_document()
+        for record in records:
+            add_session(data, record["date"], record["activity_label"], record["focus_duration"])
+        return True, list(iter_sessions(data)), new_state
+
+    def recover(self):
+        """Check a log left over from a previous run; cost depends only on the log.
+
+        Surviving records are already visible through ``load``, so the document
+        is only rewritten if the log has grown past the checkpoint threshold.
+        """
+        with file_lock(self.path):
+            records = self._read_wal()
+            if len(records) >= self.checkpoint_every:
+                self._checkpoint()
+            elif not records and os.path.exists(self.wal_path):
+                os.unlink(self.wal_path)
+
+
+class JournalStore:
+    """Append each session as one JSON line and rebuild the per-day view on read.
+
+    An existing JSON document at ``base_path`` is treated as read-only history,
+    so switching to the journal keeps everything recorded before.
+    """
+
+    def __init__(self, path, base_path=None):
+        self.path = path
+        self.base_path = base_path
+
+    def load(self):
+        """Return the per-day view of the base document plus the journal."""
+        data = JsonStore(self.base_path).load() if self.base_path else {}
+        for record in self.read_records()[0]:
+            add_session(data, record["date"], record["activity_label"], record["focus_duration"])
+        return data
+
+    def load_range(self, start_date, end_date):
+        """Return the per-day view for the days between start_date and end_date."""
+        data = JsonStore(self.base_path).load_range(start_date, end_date) if self.base_path else {}
+        for record in self.read_records()[0]:
+            if start_date <= parse_date_str(record["date"]) <= end_date:
+                add_session(data, record["date"], record["activity_label"], record["focus_duration"])
+        return data
+
+    def read_records(self, offset=0):
+        """Return the journal records after byte ``offset`` and the offset they end at.
+
+        Only complete lines are read, so a record still being appended is
+        picked up by the next call.
+        """
+        try:
+            with open(self.path, 'rb') as file:
+                file.seek(offset)
+                chunk = file.read()
+        except FileNotFoundError:
+            return [], 0
+
+        end = chunk.rfind(b"\n") + 1
+        records = []
+        for line in chunk[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A torn line from an interrupted write
+                continue
+        return records, offset + end
+
+    def changes_since(self, state):
+        """Return (reset, sessions, new_state) describing what changed after ``state``.
+
+        The state is the journal offset, so only records appended since are read
+        unless the base document changed.
+        """
+        base_state = None
+        if self.base_path:
+            base_state = [_file_identity(self.base_path), _file_identity(self.base_path + ".wal")]
+        if isinstance(state, dict) and "base" in state and state["base"] == base_state:
+            records, offset = self.read_records(state.get("offset", 0))
+            sessions = [
+                (record["date"], record["activity_label"], record["focus_duration"])
+                for record in records
+            ]
+            return False, sessions, {"base": base_state, "offset": offset}
+
+        data = JsonStore(self.base_path).load() if self.base_path else {}
+        records, offset = self.read_records()
+        for record in records:
+            add_session(data, record["date"], record["activity_label"], record["focus_duration"])
+        return True, list(iter_sessions(data)), {"base": base_state, "offset": offset}
+
+    def save_session(self, date_str, activity_label, focus_duration):
+        """Append a single session record; cost does not depend on history size."""
+        self.save_sessions([(date_str, activity_label, focus_duration)])
+
+    def save_sessions(self, sessions):
+        """Append several (date_str, activity_label, focus_duration) sessions in one write."""
+        lines = "".join(
+            json.dumps({
+                "date": date_str,
+                "activity_label": activity_label,
+                "focus_duration": focus_duration,
+            }) + "\n"
+            for date_str, activity_label, focus_duration in sessions
+        )
+        with file_lock(self.path):
+            _truncate_torn_tail(self.path)
+            with open(self.path, 'a') as file:
+                file.write(lines)
+
+
+class SqliteStore:
+    """Store sessions in SQLite, one row per day and activity label.
+
+    Dates are stored as ISO strings so range queries can use the index.
+    """
+
+    # Range reads are already cheap, so views can skip the rollup cache
+    indexed_reads = True
+
+    def __init__(self, path):
+        self.path = path
+        connection = self._connect()
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " date TEXT NOT NULL,"
+                " activity_label TEXT NOT NULL,"
+                " focus_duration INTEGER NOT NULL,"
+                " PRIMARY KEY (date, activity_label))"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS sessions_label ON sessions (activity_label, date)"
+            )
+            connection.commit()
+        finally:
+            connection.close()
+
+    def _connect(self):
+        # A connection per call keeps the store usable from any thread
+        return sqlite3.connect(self.path, timeout=10)
+
+    def _query(self, sql, params=()):
+        data = {}
+        connection = self._connect()
+        try:
+            for iso_date, activity_label, focus_duration in connection.execute(sql, params):
+                date_str = datetime.strptime(iso_date, "%Y-%m-%d").strftime(DATE_FORMAT)
+                data.setdefault(date_str, {})[sys.intern(activity_label)] = focus_duration
+        finally:
+            connection.close()
+        return data
+
+    def load(self):
+        """Return the per-day view of all recorded sessions."""
+        return self._query("SELECT date, activity_label, focus_duration FROM sessions ORDER BY date")
+
+    def load_range(self, start_date, end_date):
+        """Return the per-day view for the days between start_date and end_date."""
+        return self._query(
+            "SELECT date, activity_label, focus_duration FROM sessions"
+            " WHERE date BETWEEN ? AND ? ORDER BY date",
+            (start_date.isoformat(), end_date.isoformat()),
+        )
+
+    def changes_since(self, state):
+        """Return (reset, sessions, new_state) describing what changed after ``state``.
+
+        SQLite rows are updated in place, so any change returns every session.
+        """
+        new_state = [_file_identity(self.path), _file_identity(self.path + "-wal")]
+        if state == new_state:
+            return False, [], new_state
+        return True, list(iter_sessions(self.load())), new_state
+
+    def save_session(self, date_str, activity_label, focus_duration):
+        """Upsert a session into its day and label row."""
+        self.save_sessions([(date_str, activity_label, focus_duration)])
+
+    def save_sessions(self, sessions):
+        """Upsert several (date_str, activity_label, focus_duration) sessions in one transaction."""
+        rows = [
+            (parse_date_str(date_str).isoformat(), activity_label, focus_duration)
+            for date_str, activity_label, focus_duration in sessions
+        ]
+        connection = self._connect()
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT INTO sessions (date, activity_label, focus_duration) VALUES (?, ?, ?)"
+                    " ON CONFLICT (date, activity_label)"
+                    " DO UPDATE SET focus_duration = focus_duration + excluded.focus_duration",
+                    rows,
+                )
+        finally:
+            connection.close()
+
+
+def migrate_json_to_sqlite(json_path, db_path):
+    """Copy every session of a JSON document into a SQLite store.
+
+    Returns the number of sessions migrated.
+    """
+    sessions = list(iter_sessions(JsonStore(json_path).load()))
+    SqliteStore(db_path).save_sessions(sessions)
+    return len(sessions)
+
+
+class PartitionedStore:
+    """Store sessions in one JSON document per month, listed in a small manifest.
+
+    Each month is a JsonStore of its own (with its own log and lock), so a
+    save only touches the current month and a date range only loads the
+    months overlapping it.
+    """
+
+    # The manifest already narrows a range read to its months, so views can skip the rollup cache
+    indexed_reads = True
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def month_of(day):
+        return f"{day.year:04}-{day.month:02}"
+
+    def months(self):
+        """Return the sorted months that have a partition."""
+        try:
+            with open(self.manifest_path, 'r') as file:
+                return json.load(file)["partitions"]
+        except FileNotFoundError:
+            return []
+
+    def partition(self, month):
+        return JsonStore(os.path.join(self.directory, month + ".json"))
+
+    def _add_months(self, months):
+        with file_lock(self.manifest_path):
+            known = set(self.months())
+            if not months - known:
+                return
+            atomic_write_json(self.manifest_path, {"partitions": sorted(known | months)})
+
+    def load(self):
+        """Return the per-day view of all recorded sessions."""
+        data = {}
+        for month in self.months():
+            data.update(self.partition(month).load())
+        return data
+
+    def load_range(self, start_date, end_date):
+        """Return the per-day view for the days between start_date and end_date."""
+        first, last = self.month_of(start_date), self.month_of(end_date)
+        data = {}
+        for month in self.months():
+            if first <= month <= last:
+                data.update(self.partition(month).load_range(start_date, end_date))
+        return data
+
+    def save_session(self, date_str, activity_label, focus_duration):
+        """Add a session to its month's partition."""
+        self.save_sessions([(date_str, activity_label, focus_duration)])
+
+    def save_sessions(self, sessions):
+        """Add several (date_str, activity_label, focus_duration) sessions, grouped by month."""
+        by_month = {}
+        for session in sessions:
+            by_month.setdefault(self.month_of(parse_date_str(session[0])), []).append(session)
+        self._add_months(set(by_month))
+        for month, month_sessions in by_month.items():
+            self.partition(month).save_sessions(month_sessions)
+
+    def changes_since(self, state):
+        """Return (reset, sessions, new_state) describing what changed after ``state``.
+
+        The state holds one entry per partition; if any partition was
+        checkpointed, every session of every partition is returned.
+        """
+        state = state if isinstance(state, dict) else {}
+        changes = {month: self.partition(month).changes_since(state.get(month)) for month in self.months()}
+        new_state = {month: change[2] for month, change in changes.items()}
+        if not any(change[0] for change in changes.values()):
+            sessions = [session for change in changes.values() for session in change[1]]
+            return False, sessions, new_state
+
+        sessions = []
+        for month, (reset, month_sessions, _) in changes.items():
+            if not reset:
+                month_sessions = self.partition(month).changes_since(None)[1]
+            sessions.extend(month_sessions)
+        return True, sessions, new_state
+
+    def recover(self):
+        """Check the logs of every partition."""
+        for month in self.months():
+            self.partition(month).recover()
+
+
+def migrate_json_to_partitions(json_path, directory):
+    """Split a single JSON document into per-month partitions.
+
+    Returns the number of partitions written.
+    """
+    by_month = {}
+    for date_str, sessions in JsonStore(json_path).load().items():
+        month = PartitionedStore.month_of(parse_date_str(date_str))
+        by_month.setdefault(month, {})[date_str] = sessions
+    store = PartitionedStore(directory)
+    for month, data in by_month.items():
+        atomic_write_json(store.partition(month).path, data)
+    store._add_months(set(by_month))
+    return len(by_month)
+
+
+def _has_json_history(path):
+    # A fresh or just-checkpointed history may exist only in the document's write-ahead log
+    return os.path.exists(path) or os.path.exists(path + ".wal")
+
+
+def _remove_files(*paths):
+    for path in paths:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.unlink(path)
+
+
+def _migrate_if_missing(json_path, target_path, migrate):
+    """Call ``migrate()`` once if ``target_path`` is missing and there is JSON history to copy.
+
+    The check and the migration run under the JSON store's lock, so processes
+    opening the store at the same time migrate only once. ``migrate`` builds
+    its output under temporary names and renames ``target_path`` into place
+    last, so an interrupted migration is simply redone.
+    """
+    if os.path.exists(target_path):
+        return
+    with file_lock(json_path):
+        if not os.path.exists(target_path) and _has_json_history(json_path):
+            migrate()
+
+
+def open_store(mode="json", path="productivity_data.json"):
+    """Create the store for the given storage mode."""
+    if mode == "json":
+        store = JsonStore(path)
+        store.recover()
+        return store
+    if mode == "journal":
+        journal_path = os.path.splitext(path)[0] + ".journal"
+        return JournalStore(journal_path, base_path=path)
+    if mode == "sqlite":
+        db_path = os.path.splitext(path)[0] + ".sqlite3"
+
+        def migrate():
+            temp_path = db_path + ".migrating"
+            _remove_files(temp_path, temp_path + "-wal", temp_path + "-shm")
+            migrate_json_to_sqlite(path, temp_path)
+            os.replace(temp_path, db_path)
+
+        _migrate_if_missing(path, db_path, migrate)
+        return SqliteStore(db_path)
+    if mode == "partitioned":
+        directory = os.path.splitext(path)[0] + ".d"
+
+        def migrate():
+            temp_directory = directory + ".migrating"
+            _remove_files(temp_directory)
+            migrate_json_to_partitions(path, temp_directory)
+            os.rename(temp_directory, directory)
+
+        _migrate_if_missing(path, directory, migrate)
+        store = PartitionedStore(directory)
+        store.recover()
+        return store
+    if mode == "columnar":
+        from columnar_store import ColumnarStore, migrate_json_to_columnar
+        base_path = os.path.splitext(path)[0]
+        store = ColumnarStore(base_path)
+
+        def migrate():
+            temp = ColumnarStore(base_path + ".migrating")
+            _remove_files(temp.path, temp.path + ".lock", temp.labels_path, temp.index_path)
+            migrate_json_to_columnar(path, base_path + ".migrating")
+            # The records file goes last: its presence marks the migration done
+            if os.path.exists(temp.labels_path):
+                os.replace(temp.labels_path, store.labels_path)
+            os.replace(temp.index_path, store.index_path)
+            os.replace(temp.path, store.path)
+            _remove_files(temp.path + ".lock")
+
+        _migrate_if_missing(path, store.path, migrate)
+        store.labels = store._read_labels()
+        return store
+    raise ValueError(f"Unknown storage mode: {mode}")
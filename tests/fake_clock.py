@@ -0,0 +1,47 @@
+# tests/fake_clock.py
+
+
+class FakeClock:
+    """A monotonic clock with Tk-style ``after``/``after_cancel``, advanced by hand.
+
+    Call the instance to read the time. ``advance`` moves time forward and
+    runs the callbacks that fall due on the way, in order, with the clock set
+    to the moment each one runs. ``lateness`` delays every callback past its
+    due time, like a busy event loop.
+    """
+
+    def __init__(self, now=1000.0, lateness=0.0):
+        self.now = now
+        self.lateness = lateness
+        self._timers = {}  # id -> (due time, func)
+        self._next_id = 0
+        self.fired = []  # Times at which callbacks ran
+
+    def __call__(self):
+        return self.now
+
+    def after(self, ms, func):
+        self._next_id += 1
+        self._timers[self._next_id] = (self.now + ms / 1000, func)
+        return self._next_id
+
+    def after_cancel(self, timer_id):
+        self._timers.pop(timer_id, None)
+
+    @property
+    def pending(self):
+        """Return the due times of the scheduled callbacks."""
+        return sorted(due for due, _ in self._timers.values())
+
+    def advance(self, seconds):
+        end = self.now + seconds
+        while self._timers:
+            timer_id, (due, func) = min(self._timers.items(), key=lambda item: item[1][0])
+            runs_at = due + self.lateness
+            if runs_at > end:
+                break
+            del self._timers[timer_id]
+            self.now = max(self.now, runs_at)
+            self.fired.append(self.now)
+            func()
+        self.now = end
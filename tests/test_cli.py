@@ -0,0 +1,26 @@
+# tests/test_cli.py
+
+import argparse
+from datetime import date
+
+import pytest
+
+from cli import parse_range
+
+TODAY = date(2026, 10, 18)
+
+
+def test_last_n_days_ends_today():
+    assert parse_range("1d", TODAY) == (TODAY, TODAY)
+    assert parse_range("7d", TODAY) == (date(2026, 10, 12), TODAY)
+
+
+def test_explicit_range():
+    assert parse_range("2026-01-01:2026-01-31", TODAY) == (date(2026, 1, 1), date(2026, 1, 31))
+    assert parse_range("2026-01-01:2026-01-01", TODAY) == (date(2026, 1, 1), date(2026, 1, 1))
+
+
+@pytest.mark.parametrize("text", ["0d", "2026-01-31:2026-01-01", "7", "2026-01-01", "2026-13-01:2026-12-31", "d"])
+def test_invalid_ranges_are_rejected(text):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_range(text, TODAY)
@@ -0,0 +1,41 @@
+# tests/test_json_stream.py
+
+import io
+import json
+
+import pytest
+
+from json_stream import iter_object
+
+DOCUMENTS = [
+    '{}',
+    ' { } ',
+    '{"a": 1}',
+    '{"b": 1.5e10, "c": -12.25E-3, "d": 7}',
+    '{"a": [1, 2, {"b": "x}"}], "c" : 12345 , "d\\"e": {"f": null}, "g": true}\n',
+    json.dumps({f"{day:02}.10.2026": {"Study": day, "Work": day * 10} for day in range(1, 32)}, indent=1),
+]
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 5, 7, 10, 11, 64, 65536])
+def test_matches_json_load_for_any_chunk_size(document, chunk_size):
+    assert dict(iter_object(io.StringIO(document), chunk_size)) == json.loads(document)
+
+
+def test_yields_pairs_in_document_order():
+    pairs = iter_object(io.StringIO('{"b": 1, "a": [2], "c": {}}'), chunk_size=2)
+    assert list(pairs) == [("b", 1), ("a", [2]), ("c", {})]
+
+
+@pytest.mark.parametrize("document", ['', '[1]', '{"a": 1', '{"a" 1}', '{1: 2}', '{"a": 1,}'])
+def test_rejects_malformed_documents(document):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_object(io.StringIO(document), chunk_size=2))
+
+
+def test_stops_reading_when_iteration_stops():
+    file = io.StringIO('{"a": 1, "b": 2}' + " " * 100000)
+    pairs = iter_object(file, chunk_size=8)
+    assert next(pairs) == ("a", 1)
+    assert file.tell() < 100
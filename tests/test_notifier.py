@@ -0,0 +1,119 @@
+# tests/test_notifier.py
+
+import logging
+import threading
+import time
+
+import pytest
+
+from notifier import NotificationDispatcher
+
+
+class StubSink:
+    """Record notifications; a title in ``hold`` blocks until ``release`` is set."""
+
+    def __init__(self, hold=()):
+        self.hold = hold
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.shown = []
+
+    def __call__(self, title, message, timeout):
+        if title in self.hold:
+            self.entered.set()
+            self.release.wait(5)
+        self.shown.append((title, message, timeout))
+
+
+@pytest.fixture(autouse=True)
+def quiet_dispatcher_logs():
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def busy_dispatcher(sink, **options):
+    # Keep the worker inside the sink so later posts stay queued
+    dispatcher = NotificationDispatcher(sink=sink, **options)
+    dispatcher.post("busy", "first")
+    assert sink.entered.wait(5)
+    return dispatcher
+
+
+def test_identical_waiting_notifications_are_coalesced():
+    sink = StubSink(hold={"busy"})
+    dispatcher = busy_dispatcher(sink)
+    assert dispatcher.post("Timer", "Focus time is up!")
+    assert not dispatcher.post("Timer", "Focus time is up!")
+    assert dispatcher.post("Timer", "Break is over")
+    sink.release.set()
+    assert dispatcher.flush(timeout=5)
+    assert [message for _, message, _ in sink.shown] == ["first", "Focus time is up!", "Break is over"]
+    assert dispatcher.dropped == 0
+    dispatcher.close()
+
+
+def test_posts_beyond_max_queued_are_dropped():
+    sink = StubSink(hold={"busy"})
+    dispatcher = busy_dispatcher(sink, max_queued=2)
+    assert dispatcher.post("Timer", "one")
+    assert dispatcher.post("Timer", "two")
+    assert not dispatcher.post("Timer", "three")
+    sink.release.set()
+    assert dispatcher.flush(timeout=5)
+    assert [message for _, message, _ in sink.shown] == ["first", "one", "two"]
+    assert dispatcher.dropped == 1
+    dispatcher.close()
+
+
+def test_notifications_older_than_max_age_are_dropped():
+    sink = StubSink(hold={"busy"})
+    dispatcher = busy_dispatcher(sink, max_age=0.05)
+    dispatcher.post("Timer", "stale")
+    time.sleep(0.1)
+    sink.release.set()
+    assert dispatcher.flush(timeout=5)
+    assert [message for _, message, _ in sink.shown] == ["first"]
+    assert dispatcher.dropped == 1
+    dispatcher.close()
+
+
+def test_a_hung_sink_is_abandoned_after_the_delivery_timeout():
+    sink = StubSink(hold={"hung"})
+    dispatcher = NotificationDispatcher(sink=sink, delivery_timeout=0.05)
+    dispatcher.post("hung", "never returns")
+    dispatcher.post("Timer", "after")
+    assert dispatcher.flush(timeout=5)
+    assert sink.shown == [("Timer", "after", 10)]
+    assert (dispatcher.delivered, dispatcher.dropped) == (1, 1)
+    sink.release.set()
+    dispatcher.close()
+
+
+def test_a_failing_sink_does_not_stop_later_deliveries():
+    shown = []
+
+    def sink(title, message, timeout):
+        if message == "boom":
+            raise OSError("no notification daemon")
+        shown.append(message)
+
+    dispatcher = NotificationDispatcher(sink=sink)
+    dispatcher.post("Timer", "boom")
+    dispatcher.post("Timer", "after")
+    assert dispatcher.flush(timeout=5)
+    assert shown == ["after"]
+    dispatcher.close()
+
+
+def test_last_latency_covers_waiting_and_delivery():
+    def slow_sink(title, message, timeout):
+        time.sleep(0.05)
+
+    dispatcher = NotificationDispatcher(sink=slow_sink)
+    assert dispatcher.last_latency is None
+    dispatcher.post("Timer", "Focus time is up!")
+    assert dispatcher.flush(timeout=5)
+    assert 0.05 <= dispatcher.last_latency < 5
+    assert dispatcher.delivered == 1
+    dispatcher.close()
@@ -0,0 +1,60 @@
+# tests/test_persistence.py
+
+import logging
+
+import pytest
+
+from persistence import PersistenceWorker
+
+
+class FlakyStore:
+    def __init__(self):
+        self.failing = False
+        self.sessions = []
+
+    def save_sessions(self, sessions):
+        if self.failing:
+            raise OSError("disk full")
+        self.sessions.extend(sessions)
+
+
+@pytest.fixture(autouse=True)
+def quiet_worker_logs():
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def test_flush_writes_coalesced_sessions():
+    store = FlakyStore()
+    worker = PersistenceWorker(store, flush_interval=60)
+    worker.save_session("18.10.2026", "Study", 5)
+    worker.save_session("18.10.2026", "Study", 10)
+    worker.save_session("18.10.2026", "Work", 1)
+    assert worker.flush(timeout=5)
+    assert sorted(store.sessions) == [("18.10.2026", "Study", 15), ("18.10.2026", "Work", 1)]
+    worker.close()
+
+
+def test_flush_raises_when_the_write_fails_and_retries_later():
+    store = FlakyStore()
+    worker = PersistenceWorker(store, flush_interval=60)
+    store.failing = True
+    worker.save_session("18.10.2026", "Study", 5)
+    with pytest.raises(OSError):
+        worker.flush(timeout=5)
+    store.failing = False
+    assert worker.flush(timeout=5)
+    assert store.sessions == [("18.10.2026", "Study", 5)]
+    worker.close()
+
+
+def test_close_raises_when_the_final_write_fails():
+    store = FlakyStore()
+    worker = PersistenceWorker(store, flush_interval=60)
+    store.failing = True
+    worker.save_session("18.10.2026", "Study", 5)
+    with pytest.raises(OSError):
+        worker.close(timeout=5)
+    with pytest.raises(RuntimeError):
+        worker.save_session("18.10.2026", "Study", 1)
@@ -0,0 +1,109 @@
+# tests/test_rollup.py
+
+import os
+import shutil
+from datetime import date
+
+import pytest
+
+from rollup import RollupCache
+from storage import open_store
+
+YEAR = (date(2026, 1, 1), date(2026, 12, 31))
+
+
+@pytest.fixture(params=["json", "journal", "partitioned"])
+def store(request, tmp_path):
+    return open_store(request.param, str(tmp_path / "data.json"))
+
+
+def cache_path(store, tmp_path):
+    return str(tmp_path / f"data.{type(store).__name__}.rollup.json")
+
+
+def test_matches_the_store_as_sessions_are_saved(store, tmp_path):
+    cache = RollupCache(store, cache_path(store, tmp_path))
+    for number in range(45):
+        store.save_session(f"{number % 28 + 1:02}.10.2026", f"Label {number % 3}", number)
+        assert cache.load_range(*YEAR) == store.load_range(*YEAR)
+
+
+def test_refreshes_append_deltas_without_rewriting_the_cache(store, tmp_path):
+    path = cache_path(store, tmp_path)
+    store.save_session("17.10.2026", "Study", 5)
+    cache = RollupCache(store, path)
+    cache.load_range(*YEAR)
+    written = os.stat(path)
+
+    # Enough saves to checkpoint the JSON log more than once
+    for _ in range(45):
+        store.save_session("18.10.2026", "Study", 1)
+        cache.load_range(*YEAR)
+    assert (os.stat(path).st_ino, os.stat(path).st_mtime_ns) == (written.st_ino, written.st_mtime_ns)
+    assert cache.logged == 45
+
+    cache.close()
+    assert cache.logged == 0 and not os.path.exists(cache.log_path)
+    assert RollupCache(store, path).load_range(*YEAR) == {"17.10.2026": {"Study": 5}, "18.10.2026": {"Study": 45}}
+
+
+def test_a_checkpoint_between_refreshes_is_not_a_reset(tmp_path):
+    store = open_store("json", str(tmp_path / "data.json"))
+    cache = RollupCache(store, str(tmp_path / "rollup.json"))
+    store.save_sessions([("18.10.2026", "Study", 1)] * 15)
+    cache.load_range(*YEAR)
+    store.save_sessions([("18.10.2026", "Study", 1)] * 10)  # Checkpoints at 20
+    reset, sessions, _ = store.changes_since(cache.state)
+    assert not reset and len(sessions) == 10
+
+
+def test_reopening_replays_the_delta_log(store, tmp_path):
+    path = cache_path(store, tmp_path)
+    cache = RollupCache(store, path)
+    store.save_session("17.10.2026", "Study", 5)
+    cache.load_range(*YEAR)
+    store.save_session("18.10.2026", "Work", 7)
+    cache.load_range(*YEAR)
+
+    reopened = RollupCache(store, path)
+    assert reopened.days == cache.days and reopened.state == cache.state
+    assert reopened.load_range(*YEAR) == store.load_range(*YEAR)
+
+
+def test_a_torn_delta_is_refetched_from_the_store(store, tmp_path):
+    path = cache_path(store, tmp_path)
+    cache = RollupCache(store, path)
+    store.save_session("17.10.2026", "Study", 5)
+    cache.load_range(*YEAR)
+    store.save_session("18.10.2026", "Work", 7)
+    cache.load_range(*YEAR)
+    with open(cache.log_path, 'rb+') as file:
+        file.truncate(os.path.getsize(cache.log_path) - 5)
+
+    assert RollupCache(store, path).load_range(*YEAR) == store.load_range(*YEAR)
+
+
+def test_a_delta_log_left_from_before_a_compaction_is_ignored(store, tmp_path):
+    path = cache_path(store, tmp_path)
+    cache = RollupCache(store, path)
+    store.save_session("17.10.2026", "Study", 5)
+    cache.load_range(*YEAR)
+    store.save_session("18.10.2026", "Work", 7)
+    cache.load_range(*YEAR)
+    shutil.copy(cache.log_path, str(tmp_path / "log.copy"))
+    cache.close()
+    # A crash between writing the cache file and removing the log
+    shutil.copy(str(tmp_path / "log.copy"), cache.log_path)
+
+    assert RollupCache(store, path).load_range(*YEAR) == store.load_range(*YEAR)
+
+
+def test_a_cache_built_from_another_store_kind_is_discarded(tmp_path):
+    path = str(tmp_path / "rollup.json")
+    json_store = open_store("json", str(tmp_path / "data.json"))
+    json_store.save_session("17.10.2026", "Study", 5)
+    RollupCache(json_store, path).load_range(*YEAR)
+
+    journal = open_store("journal", str(tmp_path / "other.json"))
+    journal.save_session("18.10.2026", "Work", 7)
+    assert RollupCache(journal, path).load_range(*YEAR) == {"18.10.2026": {"Work": 7}}
@@ -0,0 +1,145 @@
+# tests/test_storage.py
+
+import json
+import multiprocessing
+import os
+import shutil
+from datetime import date
+
+import pytest
+
+from storage import JsonStore, _truncate_torn_tail, atomic_write_json, open_store
+
+MODES = ("json", "journal", "sqlite", "partitioned", "columnar")
+
+
+def test_sessions_are_merged_per_day_and_label(tmp_path):
+    store = JsonStore(str(tmp_path / "data.json"))
+    store.save_session("17.10.2026", "Study", 25)
+    store.save_sessions([("17.10.2026", "Study", 5), ("17.10.2026", "Work", 50), ("18.10.2026", "Study", 10)])
+    assert store.load() == {"17.10.2026": {"Study": 30, "Work": 50}, "18.10.2026": {"Study": 10}}
+
+
+def test_saves_go_to_the_log_until_a_checkpoint(tmp_path):
+    path = str(tmp_path / "data.json")
+    store = JsonStore(path, checkpoint_every=3)
+    store.save_session("18.10.2026", "Study", 1)
+    store.save_session("18.10.2026", "Study", 1)
+    assert not os.path.exists(path)
+    assert store.load() == {"18.10.2026": {"Study": 2}}
+
+    store.save_session("18.10.2026", "Study", 1)
+    assert not os.path.exists(store.wal_path)
+    with open(path) as file:
+        assert json.load(file) == {"18.10.2026": {"Study": 3}}
+
+
+def test_a_log_left_behind_by_a_checkpoint_is_not_applied_twice(tmp_path):
+    path = str(tmp_path / "data.json")
+    store = JsonStore(path, checkpoint_every=100)
+    atomic_write_json(path, {"17.10.2026": {"Study": 10}})
+    store.save_session("18.10.2026", "Study", 5)
+    shutil.copy(store.wal_path, str(tmp_path / "wal.copy"))
+    store.checkpoint()
+    # A crash between replacing the document and removing the log
+    shutil.copy(str(tmp_path / "wal.copy"), store.wal_path)
+    assert store.load() == {"17.10.2026": {"Study": 10}, "18.10.2026": {"Study": 5}}
+
+
+def test_a_torn_log_line_is_ignored_and_dropped_on_the_next_save(tmp_path):
+    store = JsonStore(str(tmp_path / "data.json"))
+    store.save_session("18.10.2026", "Study", 5)
+    with open(store.wal_path, 'a') as file:
+        file.write('{"date": "18.10.2026", "activity_lab')
+    assert store.load() == {"18.10.2026": {"Study": 5}}
+    store.save_session("18.10.2026", "Study", 1)
+    assert store.load() == {"18.10.2026": {"Study": 6}}
+
+
+@pytest.mark.parametrize("content, kept", [
+    (b"", b""),
+    (b"a\n", b"a\n"),
+    (b"a\nbc", b"a\n"),
+    (b"abc", b""),
+    (b"x" * 5000 + b"\n" + b"y" * 9000, b"x" * 5000 + b"\n"),
+])
+def test_truncate_torn_tail(tmp_path, content, kept):
+    path = str(tmp_path / "log")
+    with open(path, 'wb') as file:
+        file.write(content)
+    _truncate_torn_tail(path)
+    with open(path, 'rb') as file:
+        assert file.read() == kept
+
+
+def test_legacy_list_documents_are_read(tmp_path):
+    path = str(tmp_path / "data.json")
+    with open(path, 'w') as file:
+        json.dump({"17.10.2026": [{"activity_label": "Study", "focus_duration": 25},
+                                  {"activity_label": "Study", "focus_duration": 5}]}, file)
+    assert JsonStore(path).load() == {"17.10.2026": {"Study": 30}}
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_load_range_includes_both_ends(tmp_path, mode):
+    store = open_store(mode, str(tmp_path / "data.json"))
+    store.save_sessions([("30.09.2026", "Study", 1), ("01.10.2026", "Study", 2),
+                         ("31.10.2026", "Study", 3), ("01.11.2026", "Study", 4)])
+    assert store.load_range(date(2026, 10, 1), date(2026, 10, 31)) == {
+        "01.10.2026": {"Study": 2}, "31.10.2026": {"Study": 3}}
+
+
+@pytest.mark.parametrize("mode", MODES[1:])
+def test_switching_modes_migrates_history_still_in_the_log(tmp_path, mode):
+    path = str(tmp_path / "data.json")
+    JsonStore(path).save_session("18.10.2026", "Study", 5)
+    assert open_store(mode, path).load() == {"18.10.2026": {"Study": 5}}
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_changes_since_reports_new_sessions_and_rejects_foreign_state(tmp_path, mode):
+    store = open_store(mode, str(tmp_path / "data.json"))
+    store.save_session("17.10.2026", "Study", 5)
+    reset, sessions, state = store.changes_since(None)
+    assert reset and sessions == [("17.10.2026", "Study", 5)]
+
+    store.save_session("18.10.2026", "Work", 10)
+    reset, sessions, _ = store.changes_since(state)
+    if not reset:
+        assert sessions == [("18.10.2026", "Work", 10)]
+    assert store.changes_since(["not", "a", "state"])[0]
+
+
+def _save_many(mode, path, label):
+    store = open_store(mode, path)
+    for _ in range(25):
+        store.save_session("18.10.2026", label, 1)
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_concurrent_processes_lose_no_sessions(tmp_path, mode):
+    path = str(tmp_path / "data.json")
+    open_store(mode, path)
+    workers = [multiprocessing.Process(target=_save_many, args=(mode, path, f"Label {number}"))
+               for number in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert open_store(mode, path).load() == {"18.10.2026": {f"Label {number}": 25 for number in range(4)}}
+
+
+def _open(mode, path):
+    open_store(mode, path)
+
+
+@pytest.mark.parametrize("mode", ("sqlite", "partitioned", "columnar"))
+def test_concurrent_opens_migrate_once(tmp_path, mode):
+    path = str(tmp_path / "data.json")
+    atomic_write_json(path, {"17.10.2026": {"Study": 100}})
+    workers = [multiprocessing.Process(target=_open, args=(mode, path)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert open_store(mode, path).load() == {"17.10.2026": {"Study": 100}}
@@ -0,0 +1,88 @@
+# tests/test_ticker.py
+
+import pytest
+
+from fake_clock import FakeClock
+from ticker import SecondTicker
+
+
+def make_ticker(clock):
+    ticks = []
+    ticker = SecondTicker(clock.after, clock.after_cancel, ticks.append, clock=clock)
+    return ticker, ticks
+
+
+def test_ticks_once_per_second_down_to_zero():
+    clock = FakeClock()
+    ticker, ticks = make_ticker(clock)
+    ticker.start(5)
+    clock.advance(5.5)
+    assert ticks == [5, 4, 3, 2, 1, 0]
+
+
+def test_fractional_start_ticks_on_the_second_boundaries():
+    clock = FakeClock()
+    ticker, ticks = make_ticker(clock)
+    ticker.start_at(clock() + 2.5)
+    clock.advance(2.6)
+    assert ticks == [3, 2, 1, 0]
+    # Each later tick lands just after the count changes
+    assert clock.fired == pytest.approx([1000.502, 1001.502, 1002.502])
+
+
+def test_late_callbacks_do_not_accumulate_drift():
+    clock = FakeClock(lateness=0.3)
+    ticker, ticks = make_ticker(clock)
+    ticker.start(60)
+    start = clock()
+    clock.advance(61)
+    assert ticks == list(range(60, -1, -1))
+    # Every tick is late by the same amount, never by more
+    for expected_second, fired in zip(range(1, 61), clock.fired):
+        assert fired - start - expected_second < 0.31
+
+
+def test_a_very_late_callback_reports_the_true_count_without_catching_up():
+    clock = FakeClock(lateness=3.5)  # e.g. the machine was suspended
+    ticker, ticks = make_ticker(clock)
+    ticker.start(10)
+    clock.advance(9)
+    # One callback per wakeup, each showing the seconds actually left
+    assert ticks == [10, 6, 2]
+    assert len(clock.fired) == 2
+
+
+def test_hidden_ticker_coalesces_into_one_wakeup_at_the_deadline():
+    clock = FakeClock()
+    ticker, ticks = make_ticker(clock)
+    ticker.start(30)
+    ticker.set_visible(False)
+    assert clock.pending == [ticker.deadline + SecondTicker.SLACK_MS / 1000]
+    clock.advance(29)
+    assert ticks == [30]
+    clock.advance(2)
+    assert ticks == [30, 0]
+    assert clock.pending == []  # Nothing more to wake up for while hidden
+
+
+def test_showing_the_ticker_again_ticks_immediately():
+    clock = FakeClock()
+    ticker, ticks = make_ticker(clock)
+    ticker.start(30)
+    ticker.set_visible(False)
+    clock.advance(12.5)
+    ticker.set_visible(True)
+    assert ticks == [30, 18]
+    clock.advance(1)
+    assert ticks == [30, 18, 17]
+
+
+def test_stop_cancels_and_returns_seconds_left():
+    clock = FakeClock()
+    ticker, ticks = make_ticker(clock)
+    ticker.start(10)
+    clock.advance(3.2)
+    assert ticker.stop() == 7
+    assert clock.pending == []
+    clock.advance(10)
+    assert ticks == [10, 9, 8, 7]
@@ -0,0 +1,141 @@
+# tests/test_timer_daemon.py
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from timer_daemon import RemoteEngine, TimerClient, TimerDaemon
+from timer_states import TimerState
+
+
+class RecordingStore:
+    def __init__(self):
+        self.sessions = []
+
+    def save_session(self, date_str, activity_label, focus_duration):
+        self.sessions.append((date_str, activity_label, focus_duration))
+
+
+def run_daemon(socket_path):
+    daemon = TimerDaemon(RecordingStore(), socket_path)
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    while not os.path.exists(socket_path):
+        time.sleep(0.01)
+    return daemon, thread
+
+
+def stop_daemon(daemon, thread):
+    daemon.shutdown()
+    thread.join()
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    daemon, thread = run_daemon(str(tmp_path / "timer.sock"))
+    yield daemon
+    stop_daemon(daemon, thread)
+
+
+def send_raw(socket_path, request):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall((json.dumps(request) + "\n").encode())
+        return json.loads(connection.makefile('rb').readline())
+
+
+def test_commands_apply_settings_and_reply_with_the_status(daemon):
+    status = TimerClient(daemon.socket_path).request("start", focus_minutes=50, activity_label="Writing")
+    assert status["state"] == "RUNNING"
+    assert status["seconds_left"] == 50 * 60
+    assert status["activity_label"] == "Writing"
+
+
+@pytest.mark.parametrize("settings", [
+    {"focus_minutes": "abc"},
+    {"focus_minutes": -5},
+    {"focus_minutes": 0},
+    {"focus_minutes": 2.5},
+    {"break_minutes": True},
+    {"break_minutes": None},
+    {"activity_label": ""},
+    {"activity_label": 7},
+    {"focus_minutes": 30, "activity_label": "  "},
+])
+def test_invalid_settings_are_rejected_without_changing_the_engine(daemon, settings):
+    before = daemon.engine.status()
+    reply = send_raw(daemon.socket_path, {"command": "start", **settings})
+    assert reply["ok"] is False
+    assert daemon.engine.status() == before
+    assert daemon.engine.deadline is None
+
+    # The daemon keeps working afterwards
+    status = TimerClient(daemon.socket_path).request("start", focus_minutes=10)
+    assert status["state"] == "RUNNING" and status["seconds_left"] == 10 * 60
+
+
+@pytest.mark.parametrize("request_", [{"command": "explode"}, {"focus_minutes": 5}, ["start"]])
+def test_malformed_requests_are_rejected(daemon, request_):
+    assert send_raw(daemon.socket_path, request_)["ok"] is False
+
+
+def wait_for(calls):
+    deadline = time.monotonic() + 5
+    while not calls:
+        assert time.monotonic() < deadline, "nothing was scheduled"
+        time.sleep(0.01)
+
+
+def run_calls(calls):
+    while calls:
+        calls.pop(0)()
+
+
+@pytest.fixture
+def quiet_logs():
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def test_remote_engine_reports_a_lost_daemon_and_reattaches_to_a_new_one(tmp_path, quiet_logs):
+    socket_path = str(tmp_path / "timer.sock")
+    daemon, thread = run_daemon(socket_path)
+    calls, errors, events = [], [], []
+    engine = RemoteEngine(TimerClient(socket_path), calls.append, on_error=errors.append)
+    engine.subscribe(lambda event, payload: events.append(event))
+
+    stop_daemon(daemon, thread)
+    wait_for(calls)
+    run_calls(calls)
+    assert len(errors) == 1
+    engine.start()  # Reported, not raised
+    assert len(errors) == 2
+
+    daemon, thread = run_daemon(socket_path)
+    try:
+        engine.focus_minutes = 10
+        engine.start()
+        assert events == ["reattached"]
+        wait_for(calls)
+        run_calls(calls)
+        assert events == ["reattached", "started"]
+        assert engine.state == TimerState.RUNNING and engine.seconds_left() == 10 * 60
+        assert len(errors) == 2
+    finally:
+        engine.close()
+        stop_daemon(daemon, thread)
+
+
+def test_remote_engine_reports_a_rejected_command(daemon):
+    errors = []
+    engine = RemoteEngine(TimerClient(daemon.socket_path), lambda func: None, on_error=errors.append)
+    engine.focus_minutes = 0
+    engine.start()
+    assert len(errors) == 1 and daemon.engine.state == TimerState.START
+    engine.close()
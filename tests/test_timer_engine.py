@@ -0,0 +1,144 @@
+# tests/test_timer_engine.py
+
+from datetime import date
+
+import pytest
+
+from fake_clock import FakeClock
+from timer_engine import TimerEngine
+from timer_states import TimerState
+
+
+class RecordingStore:
+    def __init__(self):
+        self.sessions = []
+
+    def save_session(self, date_str, activity_label, focus_duration):
+        self.sessions.append((date_str, activity_label, focus_duration))
+
+
+def make_engine():
+    clock = FakeClock()
+    store = RecordingStore()
+    engine = TimerEngine(store, clock=clock, today=lambda: date(2026, 10, 18))
+    events = []
+    engine.subscribe(lambda event, payload: events.append((event, payload)))
+    return engine, clock, store, events
+
+
+def test_reset_saves_the_focus_minutes_spent():
+    engine, clock, store, events = make_engine()
+    engine.activity_label = "Writing"
+    engine.start()
+    clock.advance(10 * 60 + 30)
+    engine.reset()
+    assert store.sessions == [("18.10.2026", "Writing", 10)]
+    assert [event for event, _ in events] == ["started", "session_saved", "reset"]
+    assert events[1][1] == {"date": date(2026, 10, 18)}
+
+
+def test_changing_focus_minutes_mid_session_does_not_change_the_saved_length():
+    engine, clock, store, _ = make_engine()
+    engine.focus_minutes = 50
+    engine.start()
+    clock.advance(10 * 60)
+    engine.focus_minutes = 25  # e.g. applied by another front-end
+    engine.reset()
+    assert store.sessions == [("18.10.2026", "Study", 10)]
+
+
+def test_sessions_under_a_minute_are_not_saved():
+    engine, clock, store, events = make_engine()
+    engine.start()
+    clock.advance(59)
+    engine.reset()
+    assert store.sessions == []
+    assert "session_saved" not in [event for event, _ in events]
+
+
+def test_paused_time_does_not_count():
+    engine, clock, store, _ = make_engine()
+    engine.start()
+    clock.advance(5 * 60)
+    engine.pause()
+    assert engine.state == TimerState.PAUSED
+    clock.advance(60 * 60)
+    assert engine.seconds_left() == 20 * 60
+    engine.pause()
+    clock.advance(5 * 60)
+    engine.reset()
+    assert store.sessions == [("18.10.2026", "Study", 10)]
+
+
+def test_toggle_saves_a_running_focus_session_but_not_a_break():
+    engine, clock, store, _ = make_engine()
+    engine.start()
+    clock.advance(3 * 60)
+    engine.toggle()
+    assert not engine.in_focus_mode
+    assert engine.seconds_left() == 5 * 60
+    engine.start()
+    clock.advance(4 * 60)
+    engine.toggle()
+    assert store.sessions == [("18.10.2026", "Study", 3)]
+
+
+def test_time_up_is_emitted_once_and_the_count_goes_negative():
+    engine, clock, _, events = make_engine()
+    engine.focus_minutes = 1
+    engine.start()
+    clock.advance(59.5)
+    assert engine.check() == 1
+    clock.advance(1)
+    assert engine.check() == 0
+    clock.advance(5)
+    assert engine.check() == -5
+    assert [event for event, _ in events].count("time_up") == 1
+
+
+def test_status_reports_settings_and_remaining_time():
+    engine, clock, _, _ = make_engine()
+    engine.start()
+    clock.advance(90)
+    assert engine.status() == {
+        "state": "RUNNING",
+        "mode": "focus",
+        "seconds_left": 25 * 60 - 90,
+        "activity_label": "Study",
+        "focus_minutes": 25,
+        "break_minutes": 5,
+    }
+
+
+class FailingStore:
+    def save_session(self, date_str, activity_label, focus_duration):
+        raise OSError("disk full")
+
+
+def test_a_failed_save_leaves_the_engine_as_it_was():
+    clock = FakeClock()
+    engine = TimerEngine(FailingStore(), clock=clock, today=lambda: date(2026, 10, 18))
+    engine.start()
+    clock.advance(5 * 60)
+    before = engine.status(), engine.deadline
+    for command in (engine.reset, engine.toggle):
+        with pytest.raises(OSError):
+            command()
+        assert (engine.status(), engine.deadline) == before
+
+
+def test_a_bad_setting_leaves_the_engine_as_it_was():
+    engine, clock, store, events = make_engine()
+    engine.focus_minutes = None
+    with pytest.raises(TypeError):
+        engine.start()
+    assert engine.state == TimerState.START and engine.deadline is None
+
+    engine.focus_minutes = 25
+    engine.start()
+    clock.advance(5 * 60)
+    engine.break_minutes = None
+    with pytest.raises(TypeError):
+        engine.toggle()
+    assert engine.state == TimerState.RUNNING and engine.in_focus_mode
+    assert store.sessions == []
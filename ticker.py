@@ -0,0 +1,92 @@
+# ticker.py
+
+import math
+import time
+
+
+class SecondTicker:
+    """Count down to a deadline on the monotonic clock, ticking once per displayed second.
+
+    Each tick is scheduled for the moment the whole number of seconds left
+    changes, and the count is recomputed from the clock every time, so late
+    callbacks never accumulate drift and wall-clock jumps (NTP, DST) have no
+    effect. ``schedule(ms, func)`` and ``cancel(id)`` are normally a widget's
+    ``after`` and ``after_cancel``; ``clock`` can be swapped for a fake one in tests.
+
+    While nothing displays the count (``set_visible(False)``) the per-second
+    ticks are coalesced into a single wakeup at the deadline.
+    """
+
+    # Land just after the boundary rather than just before it
+    SLACK_MS = 2
+
+    def __init__(self, schedule, cancel, callback, clock=time.monotonic):
+        self.schedule = schedule
+        self.cancel = cancel
+        self.callback = callback
+        self.clock = clock
+        self.deadline = None
+        self.visible = True
+        self._pending = None
+
+    @property
+    def running(self):
+        return self.deadline is not None
+
+    def start(self, seconds):
+        """Start counting down ``seconds`` from now and tick immediately."""
+        self.start_at(self.clock() + seconds)
+
+    def start_at(self, deadline):
+        """Start counting down to a deadline on ``clock`` and tick immediately."""
+        self.stop()
+        self.deadline = deadline
+        self._tick()
+
+    def stop(self):
+        """Stop ticking and return the whole seconds that were left."""
+        if self._pending is not None:
+            self.cancel(self._pending)
+            self._pending = None
+        seconds_left = self.seconds_left() if self.deadline is not None else None
+        self.deadline = None
+        return seconds_left
+
+    def set_visible(self, visible):
+        """Switch between per-second ticks and a single wakeup at the deadline."""
+        visible = bool(visible)
+        if visible == self.visible:
+            return
+        self.visible = visible
+        if self.deadline is None:
+            return
+        if self._pending is not None:
+            self.cancel(self._pending)
+            self._pending = None
+        if visible:
+            self._tick()  # Bring the display up to date right away
+        else:
+            self._schedule_next(self.deadline - self.clock())
+
+    def seconds_left(self):
+        """Return the whole seconds left, rounded up; negative once the deadline passed."""
+        return math.ceil(self.deadline - self.clock())
+
+    def _tick(self):
+        self._pending = None
+        remaining = self.deadline - self.clock()
+        seconds_left = math.ceil(remaining)
+        self.callback(seconds_left)
+        if self.deadline is None:
+            return  # Stopped from the callback
+        self._schedule_next(remaining)
+
+    def _schedule_next(self, remaining):
+        if self.visible:
+            # Time until the count drops by one
+            delay = remaining - (math.ceil(remaining) - 1)
+        elif remaining > 0:
+            delay = remaining
+        else:
+            return  # Hidden and past the deadline: nothing left to wake up for
+        self._pending = self.schedule(int(delay * 1000) + self.SLACK_MS, self._tick)
@@ -0,0 +1,440 @@
+# timer_daemon.py
+
+import json
+import logging
+import math
+import os
+import queue
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+from storage import open_store
+from timer_engine import TimerEngine
+from timer_states import TimerState
+
+logger = logging.getLogger(__name__)
+
+COMMANDS = ("start", "pause", "reset", "toggle", "status", "subscribe")
+SETTINGS = ("focus_minutes", "break_minutes", "activity_label")
+
+
+def default_socket_path():
+    """Return the per-user socket path the daemon listens on."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"productivity-timer-{os.getuid()}.sock")
+
+
+def engine_status(engine):
+    """Return the engine status plus its monotonic deadline, for clients on the same host."""
+    status = engine.status()
+    status["in_focus_mode"] = engine.in_focus_mode
+    status["deadline"] = engine.deadline
+    return status
+
+
+def check_settings(request):
+    """Return the ``SETTINGS`` a request carries, raising ValueError if any is invalid."""
+    settings = {setting: request[setting] for setting in SETTINGS if setting in request}
+    for setting in ("focus_minutes", "break_minutes"):
+        value = settings.get(setting, 1)
+        if type(value) is not int or value <= 0:
+            raise ValueError(f"{setting} must be a positive whole number, got {value!r}")
+    label = settings.get("activity_label", "Study")
+    if not isinstance(label, str) or not label.strip():
+        raise ValueError(f"activity_label must be a non-empty string, got {label!r}")
+    return settings
+
+
+def send_message(wfile, message):
+    """Write one message to a client; returns False if the client is gone."""
+    try:
+        wfile.write((json.dumps(message) + "\n").encode())
+        wfile.flush()
+    except OSError:
+        return False
+    return True
+
+
+class _Subscriber:
+    """Push messages to one subscribed client from its own writer thread.
+
+    Posting never blocks, so a client that stops reading cannot stall the
+    daemon; once it falls ``MAX_QUEUED`` messages behind it is disconnected.
+    """
+
+    MAX_QUEUED = 64
+
+    def __init__(self, connection, wfile):
+        self.connection = connection
+        self.wfile = wfile
+        self._queue = queue.Queue(maxsize=self.MAX_QUEUED)
+        threading.Thread(target=self._run, name="timer-subscriber", daemon=True).start()
+
+    def post(self, message):
+        """Queue a message; returns False, disconnecting the client, if it has fallen behind."""
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self.disconnect()
+            return False
+        return True
+
+    def close(self):
+        """Stop the writer thread once it has sent what is queued."""
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            self.disconnect()
+
+    def disconnect(self):
+        # Wakes both a writer blocked on a full socket and the handler waiting for EOF
+        try:
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _run(self):
+        while True:
+            message = self._queue.get()
+            if message is None:
+                return
+            if not send_message(self.wfile, message):
+                self.disconnect()
+                return
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = self.server.daemon.handle_request(json.loads(line), self)
+            except (ValueError, KeyError, TypeError) as error:
+                response = {"ok": False, "error": str(error)}
+            if response is None:
+                # Subscribed: keep the connection open for pushed events until the client leaves
+                self.rfile.read()
+                break
+            send_message(self.wfile, response)
+        self.server.daemon.drop_subscriber(self.wfile)
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class TimerDaemon:
+    """Own one TimerEngine and its store, and share it over a Unix domain socket.
+
+    The protocol is one JSON object per line. A request names a ``command``
+    (one of ``COMMANDS``) and may carry any of ``SETTINGS`` to apply first;
+    a request with an invalid setting is rejected without touching the
+    engine. The reply is ``{"ok": true, "status": {...}}``. After ``subscribe`` the
+    connection stays open and receives ``{"event": ..., "payload": ...,
+    "status": ...}`` lines as the timer changes, so clients never poll.
+    """
+
+    def __init__(self, store, socket_path=None, notifier=None, clock=time.monotonic):
+        self.socket_path = socket_path or default_socket_path()
+        self.notifier = notifier
+        self.engine = TimerEngine(store, clock=clock)
+        self.engine.subscribe(self.on_engine_event)
+        self._lock = threading.RLock()
+        self._deadline_changed = threading.Condition(self._lock)
+        self._subscribers = {}  # wfile -> _Subscriber
+        self._server = None
+
+    def handle_request(self, request, handler):
+        """Run one request from a connection's handler against the engine and return the reply.
+
+        For ``subscribe`` the reply is queued here, ahead of any pushed event,
+        and None is returned.
+        """
+        command = request["command"]
+        if command not in COMMANDS:
+            raise ValueError(f"Unknown command: {command}")
+        settings = check_settings(request)
+        with self._lock:
+            for setting, value in settings.items():
+                setattr(self.engine, setting, value)
+            if command in ("start", "pause", "reset", "toggle"):
+                getattr(self.engine, command)()
+            response = {"ok": True, "status": engine_status(self.engine)}
+            if command == "subscribe":
+                subscriber = _Subscriber(handler.connection, handler.wfile)
+                subscriber.post(response)
+                self._subscribers[handler.wfile] = subscriber
+                return None
+            return response
+
+    def drop_subscriber(self, wfile):
+        with self._lock:
+            subscriber = self._subscribers.pop(wfile, None)
+        if subscriber is not None:
+            subscriber.close()
+
+    def on_engine_event(self, event, payload):
+        """Push an engine event to every subscriber and track the deadline."""
+        if event == "time_up" and self.notifier is not None:
+            self.notifier.post(title='Productivity Tracker', message='Focus time is up!', timeout=10)
+        payload = {key: value.isoformat() if isinstance(value, date) else value
+                   for key, value in payload.items()}
+        message = {"event": event, "payload": payload, "status": engine_status(self.engine)}
+        for wfile, subscriber in list(self._subscribers.items()):
+            if not subscriber.post(message):
+                del self._subscribers[wfile]
+        self._deadline_changed.notify_all()
+
+    def _watch_deadline(self):
+        # Sleep until the running countdown reaches zero, then let the engine emit time_up
+        with self._lock:
+            while True:
+                engine = self.engine
+                if engine.deadline is None or engine.notified:
+                    self._deadline_changed.wait()
+                    continue
+                delay = engine.deadline - engine.clock()
+                if delay > 0:
+                    self._deadline_changed.wait(delay)
+                    continue
+                engine.check()
+
+    def serve_forever(self):
+        """Listen on the socket until interrupted."""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = _Server(self.socket_path, _RequestHandler)
+        self._server.daemon = self
+        os.chmod(self.socket_path, 0o600)
+        threading.Thread(target=self._watch_deadline, name="deadline-watcher", daemon=True).start()
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            # Let subscribed clients see the daemon is gone
+            with self._lock:
+                subscribers, self._subscribers = list(self._subscribers.values()), {}
+            for subscriber in subscribers:
+                subscriber.disconnect()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def shutdown(self):
+        """Stop serve_forever from another thread."""
+        if self._server is not None:
+            self._server.shutdown()
+
+
+class TimerClient:
+    """Talk to a running TimerDaemon."""
+
+    def __init__(self, socket_path=None, timeout=5.0):
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+
+    def _connect(self):
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.settimeout(self.timeout)
+        connection.connect(self.socket_path)
+        return connection
+
+    def request(self, command, **settings):
+        """Send one command and return the daemon's status reply."""
+        with self._connect() as connection:
+            connection.sendall((json.dumps({"command": command, **settings}) + "\n").encode())
+            reply = json.loads(connection.makefile('rb').readline())
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error", "Request failed"))
+        return reply["status"]
+
+    def is_running(self):
+        """Return True if a daemon answers on the socket."""
+        try:
+            self.request("status")
+        except OSError:
+            return False
+        return True
+
+    def subscribe(self, callback, on_closed=None):
+        """Call ``callback(message)`` from a background thread for every pushed event.
+
+        ``on_closed()`` is called from that thread once the connection ends,
+        whichever side closed it. Returns the initial status and a function
+        that closes the subscription.
+        """
+        connection = self._connect()
+        connection.sendall(b'{"command": "subscribe"}\n')
+        reader = connection.makefile('rb')
+        status = json.loads(reader.readline())["status"]
+        connection.settimeout(None)
+
+        def read_events():
+            try:
+                for line in reader:
+                    callback(json.loads(line))
+            except Exception:
+                logger.exception("Timer daemon subscription failed")
+            finally:
+                if on_closed is not None:
+                    on_closed()
+
+        threading.Thread(target=read_events, name="timer-subscription", daemon=True).start()
+
+        def close():
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            connection.close()
+        return status, close
+
+
+class RemoteEngine:
+    """Stand-in for TimerEngine that drives a TimerDaemon, for TimerView.
+
+    Pushed events are handed to ``call_soon`` so listeners run on the caller's
+    thread (e.g. the Tk loop). ``time_up`` is not forwarded: the daemon sends
+    the notification itself so several front-ends don't each show one.
+
+    If the daemon goes away the engine subscribes again, right away and then
+    before each command, and emits ``reattached`` once it has the daemon's
+    status back. A command the daemon cannot run is passed to
+    ``on_error(error)`` instead of raising into the caller.
+    """
+
+    def __init__(self, client, call_soon, clock=time.monotonic, on_error=None):
+        self.client = client
+        self.call_soon = call_soon
+        self.clock = clock
+        self.on_error = on_error
+        self._listeners = []
+        self._unsubscribe = None
+        self._closed = False
+        self._attach()
+
+    def _attach(self):
+        status, self._unsubscribe = self.client.subscribe(self._on_message, self._on_closed)
+        self._apply_status(status)
+
+    def _reattach(self):
+        self._attach()
+        self._emit("reattached", {})
+
+    def _on_closed(self):
+        if not self._closed:
+            self.call_soon(self._connection_lost)
+
+    def _connection_lost(self):
+        if self._closed or self._unsubscribe is None:
+            return
+        logger.warning("Lost the connection to the timer daemon")
+        self._unsubscribe()
+        self._unsubscribe = None
+        try:
+            self._reattach()
+        except OSError as error:
+            self._report(error)
+
+    def _report(self, error):
+        logger.warning("Timer daemon command failed: %s", error)
+        if self.on_error is not None:
+            self.on_error(error)
+
+    def close(self):
+        """End the subscription; the daemon and its timer keep running."""
+        self._closed = True
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    def _apply_status(self, status):
+        # The daemon's settings win; the view overrides them only for the commands it sends them with
+        self.status_snapshot = status
+        self.state = TimerState[status["state"]]
+        self.focus_minutes = status["focus_minutes"]
+        self.break_minutes = status["break_minutes"]
+        self.activity_label = status["activity_label"]
+        self.in_focus_mode = status["in_focus_mode"]
+        self.deadline = status["deadline"]
+        self.remaining = status["seconds_left"]
+
+    def _on_message(self, message):
+        self.call_soon(lambda: self._dispatch(message))
+
+    def _dispatch(self, message):
+        self._apply_status(message["status"])
+        event, payload = message["event"], dict(message["payload"])
+        if event == "time_up":
+            return
+        if "date" in payload:
+            payload["date"] = date.fromisoformat(payload["date"])
+        self._emit(event, payload)
+
+    def _emit(self, event, payload):
+        for listener in list(self._listeners):
+            listener(event, payload)
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    def seconds_left(self):
+        if self.deadline is not None:
+            return math.ceil(self.deadline - self.clock())
+        return self.remaining
+
+    def status(self):
+        return self.status_snapshot
+
+    def check(self):
+        # The daemon detects time-up on its own
+        return self.seconds_left()
+
+    def _request(self, command, **settings):
+        try:
+            if self._unsubscribe is None:
+                self._reattach()
+            self.client.request(command, **settings)
+        except (OSError, ValueError, RuntimeError) as error:
+            self._report(error)
+
+    def _command(self, command):
+        # Settings go along only with the commands that read them, so a pause leaves them alone
+        self._request(command, focus_minutes=self.focus_minutes, break_minutes=self.break_minutes,
+                      activity_label=self.activity_label)
+
+    def start(self):
+        self._command("start")
+
+    def pause(self):
+        self._request("pause")
+
+    def reset(self):
+        self._command("reset")
+
+    def toggle(self):
+        self._command("toggle")
+
+
+def main(argv=None):
+    """Run the daemon: ``python timer_daemon.py [socket_path]``."""
+    from notifier import NotificationDispatcher
+
+    argv = sys.argv[1:] if argv is None else argv
+    socket_path = argv[0] if argv else os.environ.get("PRODUCTIVITY_SOCKET")
+    store = open_store(os.environ.get("PRODUCTIVITY_STORAGE", "json"))
+    daemon = TimerDaemon(store, socket_path, notifier=NotificationDispatcher())
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# timer_engine.py
+
+import math
+import time
+from datetime import date
+
+from storage import DATE_FORMAT
+from timer_states import TimerState
+
+
+class TimerEngine:
+    """Focus/break timer logic without any UI.
+
+    The engine keeps a deadline on an injectable monotonic ``clock`` and never
+    schedules anything itself: callers drive it with the commands below and
+    call ``check`` whenever they want the time-up event to be detected.
+    Listeners registered with ``subscribe`` are called as
+    ``listener(event, payload)`` with one of ``EVENTS`` and a dict.
+    """
+
+    EVENTS = ("started", "paused", "resumed", "reset", "toggled", "time_up", "session_saved")
+
+    def __init__(self, store, clock=time.monotonic, today=date.today):
+        self.store = store
+        self.clock = clock
+        self.today = today
+
+        # Settings, read when a command runs
+        self.focus_minutes = 25
+        self.break_minutes = 5
+        self.activity_label = "Study"
+
+        self.state = TimerState.START
+        self.in_focus_mode = True
+        self.notified = False
+        self.deadline = None  # Set while running
+        self.remaining = self.duration()  # Seconds left while not running
+        self.session_length = None  # Seconds the current countdown started with
+        self._listeners = []
+
+    def subscribe(self, listener):
+        """Call ``listener(event, payload)`` for every engine event."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    def _emit(self, event, **payload):
+        for listener in list(self._listeners):
+            listener(event, payload)
+
+    def duration(self, in_focus_mode=None):
+        """Return the length of a mode in seconds, the current one by default."""
+        if in_focus_mode is None:
+            in_focus_mode = self.in_focus_mode
+        return (self.focus_minutes if in_focus_mode else self.break_minutes) * 60
+
+    def seconds_left(self):
+        """Return the whole seconds left, rounded up; negative once time is up."""
+        if self.deadline is not None:
+            return math.ceil(self.deadline - self.clock())
+        return self.remaining
+
+    def status(self):
+        """Return a snapshot of the timer as plain data."""
+        return {
+            "state": self.state.name,
+            "mode": "focus" if self.in_focus_mode else "break",
+            "seconds_left": self.seconds_left(),
+            "activity_label": self.activity_label,
+            "focus_minutes": self.focus_minutes,
+            "break_minutes": self.break_minutes,
+        }
+
+    def _freeze(self):
+        # Stop the clock, keeping the seconds that were left
+        if self.deadline is not None:
+            self.remaining = self.seconds_left()
+            self.deadline = None
+
+    def start(self):
+        """Start a new countdown for the current mode."""
+        if self.state == TimerState.START:
+            # Work out the new values before changing anything, so a failure leaves the engine as it was
+            remaining = self.duration()
+            deadline = self.clock() + remaining
+            self.remaining = self.session_length = remaining
+            self.deadline = deadline
+            self.state = TimerState.RUNNING
+            self._emit("started")
+
+    def pause(self):
+        """Pause or resume the timer."""
+        if self.state == TimerState.RUNNING:
+            self._freeze()
+            self.state = TimerState.PAUSED
+            self._emit("paused")
+        elif self.state == TimerState.PAUSED:
+            self.deadline = self.clock() + self.remaining
+            self.state = TimerState.RUNNING
+            self._emit("resumed")
+
+    def reset(self):
+        """Save the current session and go back to the start of the current mode."""
+        remaining = self.duration()
+        if self.state != TimerState.START:
+            self.save_session()
+
+        self._freeze()
+        self.remaining = remaining
+        self.notified = False
+        self.state = TimerState.START
+        self._emit("reset")
+
+    def toggle(self):
+        """Save a running session and switch between focus and break modes."""
+        remaining = self.duration(not self.in_focus_mode)
+        if self.state == TimerState.RUNNING:
+            self.save_session()
+
+        self._freeze()
+        self.in_focus_mode = not self.in_focus_mode
+        self.remaining = remaining
+        self.notified = False
+        self.state = TimerState.START
+        self._emit("toggled")
+
+    def check(self):
+        """Emit ``time_up`` once the countdown reaches zero; returns the seconds left."""
+        seconds_left = self.seconds_left()
+        if self.state == TimerState.RUNNING and seconds_left <= 0 and not self.notified:
+            self.notified = True
+            self._emit("time_up")
+        return seconds_left
+
+    def save_session(self):
+        """Record the focus minutes spent so far; break sessions are not saved."""
+        if not self.in_focus_mode:
+            return
+
+        # Settings may have changed since the start, so measure against the length started with
+        duration_minutes = (self.session_length - self.seconds_left()) // 60
+        if duration_minutes <= 0:
+            return
+
+        day = self.today()
+        self.store.save_session(day.strftime(DATE_FORMAT), self.activity_label, duration_minutes)
+        self._emit("session_saved", date=day)
@@ -1,38 +1,53 @@
 # timer_view.py
 
-import json
-import os
+import sys
+import time
 import tkinter as tk
-from datetime import datetime, timedelta
 from tkinter import ttk
 
-from plyer import notification
-
+from notifier import NotificationDispatcher
+from storage import JsonStore
+from ticker import SecondTicker
+from timer_engine import TimerEngine
 from timer_states import TimerState
 
 
 class TimerView:
-    def __init__(self, parent, images, update_callback):
+    def __init__(self, parent, images, update_callback, store=None, session_callback=None,
+                 clock=time.monotonic, notifier=None, engine=None):
         self.parent = parent
         self.images = images
         self.update_callback = update_callback
+        self.session_callback = session_callback
 
         # Variables
         self.focus_time = tk.IntVar(value=25)
         self.break_time = tk.IntVar(value=5)
         self.time_remaining = tk.StringVar()
         self.activity_label = tk.StringVar(value="Study")
-        self.notified = False
-        self.in_focus_mode = True  # Boolean to track if in focus mode
-        self.start_time = None
-        self.end_time = None
-        self.elapsed_time = self.focus_time.get() * 60
         self.data_file = "productivity_data.json"
-        self.state = TimerState.START
+        self.notifier = notifier if notifier is not None else NotificationDispatcher()
+
+        # All timer logic lives in the engine; this view only reflects its events
+        if engine is None:
+            store = store if store is not None else JsonStore(self.data_file)
+            engine = TimerEngine(store, clock=clock)
+        self.engine = engine
+        self.engine.subscribe(self.on_engine_event)
+        # Ticks on whole-second boundaries of the engine's deadline
+        self.ticker = SecondTicker(self.parent.after, self.parent.after_cancel, self.update_timer,
+                                   clock=self.engine.clock)
 
         # Initialize the frame
         self.frame = ttk.Frame(self.parent)
         self.create_timer_view()
+        self.sync_with_engine()
+
+        # Only tick every second while the countdown can actually be seen
+        self.frame.bind("<Map>", self.on_visibility_change, add="+")
+        self.frame.bind("<Unmap>", self.on_visibility_change, add="+")
+        self.parent.bind("<Map>", self.on_visibility_change, add="+")
+        self.parent.bind("<Unmap>", self.on_visibility_change, add="+")
 
     def create_timer_view(self):
         """Create the timer view with timer display and controls."""
@@ -62,112 +77,100 @@ class TimerView:
 
         self.update_time_display()
 
-    def update_time_display(self):
+    def sync_with_engine(self):
+        """Match the fields, buttons and ticker to an engine that may already be running."""
+        self.focus_time.set(self.engine.focus_minutes)
+        self.break_time.set(self.engine.break_minutes)
+        self.activity_label.set(self.engine.activity_label)
+        if self.engine.state == TimerState.PAUSED:
+            self.pause_button.config(text="Resume", image=self.images['play'])
+        else:
+            self.pause_button.config(text="Pause", image=self.images['pause'])
+        if self.engine.in_focus_mode:
+            self.toggle_button.config(text="Switch to Break")
+        else:
+            self.toggle_button.config(text="Switch to Focus")
+        if self.engine.deadline is not None:
+            self.ticker.start_at(self.engine.deadline)
+        else:
+            self.ticker.stop()
+            self.update_time_display()
+
+    def update_time_display(self, seconds_left=None):
         """Update the timer display with the current remaining time."""
-        minutes, seconds = divmod(abs(self.elapsed_time), 60)
-        sign = "-" if self.elapsed_time < 0 else ""
+        if seconds_left is None:
+            seconds_left = self.engine.seconds_left()
+        minutes, seconds = divmod(abs(seconds_left), 60)
+        sign = "-" if seconds_left < 0 else ""
         self.time_remaining.set(f"{sign}{minutes:02}:{seconds:02}")
 
-    """Update the timer countdown."""
-    def update_timer(self):
-        if self.state == TimerState.RUNNING:
-            now = datetime.now()
-            self.elapsed_time = int((self.end_time - now).total_seconds())
+    def on_visibility_change(self, event=None):
+        """Suspend per-second ticks while the view is hidden or the window minimized."""
+        self.ticker.set_visible(self.frame.winfo_viewable())
+
+    def apply_settings(self):
+        """Copy the entry fields into the engine before running a command."""
+        self.engine.focus_minutes = self.focus_time.get()
+        self.engine.break_minutes = self.break_time.get()
+        # Interned so queued and saved sessions share the label string
+        self.engine.activity_label = sys.intern(self.activity_label.get())
+
+    def on_engine_event(self, event, payload):
+        """Reflect an engine event in the widgets."""
+        if event == "reattached":
+            # A remote engine reconnected to a daemon that may have restarted
+            self.sync_with_engine()
+            return
+        if event in ("started", "resumed"):
+            self.ticker.start_at(self.engine.deadline)
+        elif event in ("paused", "reset", "toggled"):
+            self.ticker.stop()
 
-            if self.elapsed_time <= 0 and not self.notified:
-                self.notify_time_up()
+        if event == "paused":
+            self.pause_button.config(text="Resume", image=self.images['play'])
+        elif event in ("resumed", "reset", "toggled"):
+            self.pause_button.config(text="Pause", image=self.images['pause'])
 
+        if event == "toggled":
+            if self.engine.in_focus_mode:
+                self.toggle_button.config(text="Switch to Break")
+            else:
+                self.toggle_button.config(text="Switch to Focus")
+        elif event == "time_up":
+            self.notify_time_up()
+        elif event == "session_saved" and self.session_callback is not None:
+            self.session_callback(payload["date"])
+
+        if event in ("paused", "reset", "toggled"):
             self.update_time_display()
-            self.parent.after(1000, self.update_timer)
+
+    """Update the timer countdown."""
+    def update_timer(self, seconds_left):
+        self.engine.check()
+        self.update_time_display(seconds_left)
 
     def start_timer(self):
-        if self.state == TimerState.START:
-            self.state = TimerState.RUNNING
-            self.start_time = datetime.now()
-            self.end_time = self.start_time + timedelta(
-                minutes=self.focus_time.get() if self.in_focus_mode else self.break_time.get())
-            self.update_timer()
+        self.apply_settings()
+        self.engine.start()
 
     """Pause or resume the timer."""
     def pause_timer(self):
-        if self.state == TimerState.RUNNING:
-            self.state = TimerState.PAUSED
-            self.pause_button.config(text="Resume", image=self.images['play'])
-            self.elapsed_time = int((self.end_time - datetime.now()).total_seconds())
-        elif self.state == TimerState.PAUSED:
-            self.state = TimerState.RUNNING
-            self.start_time = datetime.now()
-            self.end_time = self.start_time + timedelta(seconds=self.elapsed_time)
-            self.pause_button.config(text="Pause", image=self.images['pause'])
-            self.update_timer()
+        self.engine.pause()
 
     """Reset the timer."""
     def reset_timer(self):
-        if self.state != TimerState.START:
-            self.save_session()
-
-        self.state = TimerState.START
-        self.notified = False
-        self.pause_button.config(text="Pause", image=self.images['pause'])
-        self.elapsed_time = self.focus_time.get() * 60 if self.in_focus_mode else self.break_time.get() * 60
-        self.update_time_display()
+        self.apply_settings()
+        self.engine.reset()
 
     """Notify the user when the timer is up."""
     def notify_time_up(self):
-        notification.notify(
+        self.notifier.post(
             title='Productivity Tracker',
             message='Focus time is up!',
             timeout=10
         )
-        self.notified = True
 
     """Toggle between focus and break modes."""
     def toggle_timer(self):
-        if self.state == TimerState.RUNNING:
-            self.save_session()
-        self.state = TimerState.START
-        self.pause_button.config(text="Pause", image=self.images['pause'])
-
-        self.in_focus_mode = not self.in_focus_mode
-
-        if self.in_focus_mode:
-            self.toggle_button.config(text="Switch to Break")
-            self.elapsed_time = self.focus_time.get() * 60
-        else:
-            self.toggle_button.config(text="Switch to Focus")
-            self.elapsed_time = self.break_time.get() * 60
-
-        self.update_time_display()
-
-    def save_session(self):
-        if not self.in_focus_mode or self.start_time is None:
-            return  # Do not save break sessions
-
-        duration_minutes = (self.focus_time.get() * 60 - self.elapsed_time) // 60
-        if duration_minutes == 0:
-            return
-
-        session_data = {
-            "activity_label": self.activity_label.get(),
-            "focus_duration": duration_minutes,
-        }
-
-        if os.path.exists(self.data_file):
-            with open(self.data_file, 'r') as file:
-                data = json.load(file)
-        else:
-            data = {}
-
-        date_str = datetime.now().strftime("%d.%m.%Y")
-        if date_str not in data:
-            data[date_str] = []
-
-        for session in data[date_str]:
-            if session["activity_label"] == self.activity_label.get():
-                session["focus_duration"] += duration_minutes
-                break
-        else:
-            data[date_str].append(session_data)
-
-        with open(self.data_file, 'w') as file:
-            json.dump(data, file, indent=1)
+        self.apply_settings()
+        self.engine.toggle()